@@ -0,0 +1,73 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.connection import ConnectionPool
+from db.migrations import create_tables
+
+ROWS = 5000
+QUERIES = 20000
+
+def seed(path):
+    connection = sqlite3.connect(path)
+    create_tables(connection.cursor())
+    connection.executemany(
+        "INSERT INTO tickets (server_id, ticket_id, channel_id, owner, status) VALUES (?, ?, ?, ?, 'open')",
+        [(i % 10, i, i, i % 200) for i in range(1, ROWS + 1)]
+    )
+    connection.execute("INSERT INTO config (server_id, admin_role_ids, tickets_categories, max_tickets_per_user) VALUES (1, '[1, 2]', '[3]', 3)")
+    connection.commit()
+    connection.close()
+
+def connect_per_call(path):
+    start = time.perf_counter()
+    for i in range(QUERIES):
+        connection = sqlite3.connect(path)
+        cursor = connection.cursor()
+        cursor.execute("SELECT admin_role_ids, log_channel_id, tickets_categories, max_tickets_per_user FROM config WHERE server_id = ?", (1,))
+        cursor.fetchone()
+        connection.close()
+    return QUERIES / (time.perf_counter() - start)
+
+def pooled(path):
+    pool = ConnectionPool(path, readers=1)
+    start = time.perf_counter()
+    for i in range(QUERIES):
+        with pool.reader() as connection:
+            connection.execute("SELECT admin_role_ids, log_channel_id, tickets_categories, max_tickets_per_user FROM config WHERE server_id = ?", (1,)).fetchone()
+    elapsed = time.perf_counter() - start
+    pool.close()
+    return QUERIES / elapsed
+
+def connect_per_call_writes(path, count):
+    start = time.perf_counter()
+    for i in range(count):
+        connection = sqlite3.connect(path)
+        connection.execute("UPDATE tickets SET updated_at = ? WHERE ticket_id = ?", (str(i), i % ROWS + 1))
+        connection.commit()
+        connection.close()
+    return count / (time.perf_counter() - start)
+
+def pooled_writes(path, count):
+    pool = ConnectionPool(path)
+    start = time.perf_counter()
+    for i in range(count):
+        with pool.writer() as connection:
+            connection.execute("UPDATE tickets SET updated_at = ? WHERE ticket_id = ?", (str(i), i % ROWS + 1))
+    elapsed = time.perf_counter() - start
+    pool.close()
+    return count / elapsed
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        seed(path)
+        writes = QUERIES // 10
+        print(f"reads  connect-per-call: {connect_per_call(path):>10.0f} q/s")
+        print(f"reads  pooled (WAL):     {pooled(path):>10.0f} q/s")
+        print(f"writes connect-per-call: {connect_per_call_writes(path, writes):>10.0f} q/s")
+        print(f"writes pooled (WAL):     {pooled_writes(path, writes):>10.0f} q/s")
@@ -0,0 +1,93 @@
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.migrations import create_tables, create_ticket_messages, create_ticket_search
+
+TICKETS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+MESSAGES_PER_TICKET = 2
+GUILDS = 50
+QUERIES = 200
+PAGE_SIZE = 6
+BATCH = 50000
+
+WORDS = ["printer", "login", "password", "refund", "invoice", "crash", "update", "server", "lag", "ban",
+         "appeal", "role", "verify", "payment", "bug", "report", "account", "email", "shipping", "order"]
+RARE_WORDS = [f"code{i}" for i in range(5000)]
+
+def sentence(rng, length):
+    words = [rng.choice(WORDS) for _ in range(length)]
+    words.append(rng.choice(RARE_WORDS))
+    return " ".join(words)
+
+def seed(path):
+    rng = random.Random(1)
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    cursor = connection.cursor()
+    create_tables(cursor)
+    create_ticket_messages(cursor)
+    create_ticket_search(cursor)
+
+    start = time.perf_counter()
+    for first in range(1, TICKETS + 1, BATCH):
+        last = min(first + BATCH, TICKETS + 1)
+        connection.executemany(
+            "INSERT INTO tickets (server_id, ticket_id, channel_id, title, description, owner) VALUES (?, ?, ?, ?, ?, ?)",
+            [(i % GUILDS, i, i, sentence(rng, 3), sentence(rng, 12), i % 1000) for i in range(first, last)]
+        )
+        connection.executemany(
+            "INSERT INTO ticket_messages (ticket_id, author_id, created_at, content) VALUES (?, ?, ?, ?)",
+            [(i, i % 1000, "2026-01-01T00:00:00", sentence(rng, 8)) for i in range(first, last) for _ in range(MESSAGES_PER_TICKET)]
+        )
+        connection.commit()
+    connection.close()
+    return time.perf_counter() - start
+
+def like_scan(connection, server_id, term):
+    pattern = f"%{term}%"
+    return connection.execute(
+        "SELECT ticket_id FROM tickets WHERE server_id = ? AND (title LIKE ? OR description LIKE ?) ORDER BY ticket_id DESC LIMIT ?",
+        (server_id, pattern, pattern, PAGE_SIZE)
+    ).fetchall()
+
+def measure(name, search, terms):
+    latencies = []
+    for server_id, term in terms:
+        start = time.perf_counter()
+        search(server_id, term)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000
+    print(f"{name:<22} p50 {p50:>8.2f} ms   p95 {p95:>8.2f} ms")
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        print(f"seeding {TICKETS} tickets and {TICKETS * MESSAGES_PER_TICKET} messages...")
+        print(f"seeded in {seed(path):.1f}s ({os.path.getsize(path) / 1024 / 1024:.0f} MiB)")
+
+        import db.connection
+        from db.connection import ConnectionPool
+        db.connection.pool = ConnectionPool(path)
+        import db.database
+        db.database.pool = db.connection.pool
+        from db.database import search_tickets
+
+        rng = random.Random(2)
+        rare_terms = [(rng.randrange(GUILDS), rng.choice(RARE_WORDS)) for _ in range(QUERIES)]
+        common_terms = [(rng.randrange(GUILDS), rng.choice(WORDS)) for _ in range(QUERIES // 10)]
+
+        measure("fts5 rare term", lambda server_id, term: search_tickets(server_id, term, PAGE_SIZE), rare_terms)
+        measure("fts5 common term", lambda server_id, term: search_tickets(server_id, term, PAGE_SIZE), common_terms)
+        connection = sqlite3.connect(path)
+        measure("LIKE scan rare term", lambda server_id, term: like_scan(connection, server_id, term), rare_terms[:QUERIES // 10])
+        connection.close()
+        db.connection.pool.close()
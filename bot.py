@@ -1,26 +1,42 @@
+import argparse
 import asyncio
 import json
 import os
 import discord
 from discord.ext import commands
-from db.database import setup_database, fetch_config
-from utils.embeds import create_success_embed, create_embed
+from db.database import setup_database, get_log_channel_id_async, close_database
+from db.write_behind import write_behind
+from utils.embeds import create_success_embed
+from utils.rest_scheduler import rest_scheduler, BACKGROUND
+from utils.sharding import parse_shard_ids, format_shard_ids
 import datetime
 import sys
-from discord import Color
 
 with open('config.json', 'r') as f:
     config = json.load(f)
 
+parser = argparse.ArgumentParser()
+parser.add_argument("--shard-ids", default=None)
+parser.add_argument("--shard-count", type=int, default=config.get("shard_count"))
+parser.add_argument("--cluster-id", type=int, default=0)
+args = parser.parse_args()
+
+shard_ids = parse_shard_ids(args.shard_ids)
+cluster_name = f"cluster {args.cluster_id}" + (f" shards {format_shard_ids(shard_ids)}" if shard_ids else "")
+
 intents = discord.Intents.all()
-client = commands.Bot(command_prefix='!', intents=intents, application_id=config["application_id"])
+client = commands.AutoShardedBot(command_prefix='!', intents=intents, application_id=config["application_id"], shard_ids=shard_ids, shard_count=args.shard_count)
+
+database_ready = False
+ready_shards = set()
 
-async def change_bot_status(guild_count, total_member):
+async def change_bot_status():
     await client.wait_until_ready()
     while not client.is_closed():
         await client.change_presence(activity=discord.Game(name="docs : nomartnotes.xyz"))
         await asyncio.sleep(4)
-        await client.change_presence(activity=discord.Game(name="{} members in {} servers".format(total_member, guild_count)))
+        total_members = sum(guild.member_count or 0 for guild in client.guilds)
+        await client.change_presence(activity=discord.Game(name="{} members in {} servers".format(total_members, len(client.guilds))))
         await asyncio.sleep(4)
 
 async def load_all_cogs():
@@ -48,15 +64,6 @@ async def sync_slash_commands():
 
         sys.stdout.write(f"\r[{datetime.datetime.now()}] [\033[1;36mCONSOLE\033[0;0m]: Slash commands synchronized with guilds    \n")
         sys.stdout.flush()
-
-        server_id = client.guilds[0].id 
-        config_data = fetch_config(server_id)
-        if config_data:
-            log_channel_id = config_data[1]
-            if log_channel_id:
-                log_channel = client.get_channel(int(log_channel_id))
-                if log_channel:
-                    await log_channel.send(embed=create_embed(title="Info", description="Slash commands synchronized with guilds", color=Color.from_rgb(100,150,255)))
     except Exception as e:
         print(f"[{datetime.datetime.now()}] [\033[91mERROR\033[0;0m]: {e}")
 
@@ -67,33 +74,68 @@ async def animate_sync(animation, index):
         index = (index + 1) % len(animation)
         await asyncio.sleep(0.2)
 
+async def announce_shard_ready(shard_id: int):
+    for guild in [guild for guild in client.guilds if guild.shard_id == shard_id]:
+        log_channel_id = await get_log_channel_id_async(guild.id)
+        log_channel = guild.get_channel(int(log_channel_id)) if log_channel_id else None
+        if log_channel:
+            embed = create_success_embed("tickets&reactions ready")
+            rest_scheduler.schedule(lambda log_channel=log_channel: log_channel.send(embed=embed), guild_id=guild.id, route="log_send", priority=BACKGROUND)
+
+@client.event
+async def on_shard_connect(shard_id: int):
+    print(f"[{datetime.datetime.now()}] [\033[37mCONSOLE\033[0;0m]: {cluster_name}: shard {shard_id} connected")
+
+@client.event
+async def on_shard_disconnect(shard_id: int):
+    print(f"[{datetime.datetime.now()}] [\033[93mCONSOLE\033[0;0m]: {cluster_name}: shard {shard_id} disconnected")
+
+@client.event
+async def on_shard_resumed(shard_id: int):
+    print(f"[{datetime.datetime.now()}] [\033[37mCONSOLE\033[0;0m]: {cluster_name}: shard {shard_id} resumed")
+
+@client.event
+async def on_shard_ready(shard_id: int):
+    try:
+        guild_count = sum(1 for guild in client.guilds if guild.shard_id == shard_id)
+        print(f"[{datetime.datetime.now()}] [\033[1;32mCONSOLE\033[0;0m]: {cluster_name}: shard {shard_id} ready with {guild_count} guilds")
+        if shard_id in ready_shards:
+            return
+        ready_shards.add(shard_id)
+        if database_ready:
+            await announce_shard_ready(shard_id)
+    except Exception as error:
+        print(f"[{datetime.datetime.now()}] [\033[91mERROR\033[0;0m]: shard {shard_id} ready handling failed: {error}")
+
 @client.event
 async def on_ready():
+    global database_ready
     try:
+        if database_ready:
+            return
         await setup_database(client)
+        database_ready = True
+        client.dispatch("database_ready")
         botName = "tickets&reactions"
-        print(f"[{datetime.datetime.now()}] [\033[1;32mCONSOLE\033[0;0m]: {botName} ready")
-        
-        server_id = client.guilds[0].id 
-        config_data = fetch_config(server_id)
-        if config_data:
-            log_channel_id = config_data[1]
-            if log_channel_id:
-                log_channel = client.get_channel(int(log_channel_id))
-                if log_channel:
-                    embed = create_success_embed(f"{botName} ready")
-                    guild_count = len(client.guilds)
-                    total_members = sum(guild.member_count for guild in client.guilds)
-                    client.loop.create_task(change_bot_status(guild_count, total_members))
-                    await log_channel.send(embed=embed)
-                    await sync_slash_commands()
-                    
+        print(f"[{datetime.datetime.now()}] [\033[1;32mCONSOLE\033[0;0m]: {botName} ready ({cluster_name}, {len(client.guilds)} guilds)")
+
+        for shard_id in ready_shards:
+            await announce_shard_ready(shard_id)
+        client.loop.create_task(change_bot_status())
+        if shard_ids is None or 0 in shard_ids:
+            await sync_slash_commands()
+
     except BaseException as error:
         print(f'An exception occurred: {error}')
 
 async def main():
     await load_all_cogs()
-    await client.start(config["token"])
+    write_behind.start()
+    try:
+        await client.start(config["token"])
+    finally:
+        await write_behind.stop()
+        close_database()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -7,7 +7,11 @@ from discord.ext import commands
 from discord import ButtonStyle, app_commands, Color, TextChannel, Member, Interaction
 from utils.embeds import create_error_embed
 from utils.error_handler import handle_command_exception
-from db.database import add_ticket_category, fetch_admin_role_ids, fetch_config, fetch_ticket_categories, insert_config, update_config, add_admin_role, delete_admin_role
+from utils.category_index import category_indexes
+from utils.channel_pool import channel_pool
+from utils.rest_scheduler import rest_scheduler
+from utils.ticket_router import ticket_router
+from db.database import add_category_admin_async, remove_category_admin_async, is_ticket_category_async, add_ticket_category_async, fetch_config_async, insert_config_async, update_config_async, add_admin_role_async, delete_admin_role_async, is_guild_admin_async
 
 class Config(commands.GroupCog, name="config"):
     def __init__(self, client):
@@ -21,30 +25,27 @@ class Config(commands.GroupCog, name="config"):
         if user_id == interaction.guild.owner_id:
             return True
 
-        admin_role_ids = fetch_admin_role_ids(server_id)
-        for role in interaction.user.roles:
-            if role.id in admin_role_ids:
-                return True
-
-        return False
+        candidate_ids = [user_id] + [role.id for role in interaction.user.roles]
+        return await is_guild_admin_async(server_id, candidate_ids)
 
     @app_commands.command(name="set", description="Set a configuration option for the server")
-    async def set_config(self, interaction: Interaction, log_channel: Optional[TextChannel] = None, admin_user: Optional[Member] = None, max_tickets_per_user: app_commands.Range[int, 1, 5] = None):
+    async def set_config(self, interaction: Interaction, log_channel: Optional[TextChannel] = None, admin_user: Optional[Member] = None, max_tickets_per_user: app_commands.Range[int, 1, 5] = None, channel_pool_size: app_commands.Range[int, 0, 10] = None):
         try:
             try:
                 server_id = interaction.guild.id
-                config_data = fetch_config(server_id)
+                config_data = await fetch_config_async(server_id)
 
                 embed = discord.Embed(title="Configuration Update", color=discord.Color.green())
                 changes_made = False
 
                 if config_data is None:
-                    insert_config(server_id, [admin_user.id] if admin_user else [], log_channel.id if log_channel else None)
+                    await insert_config_async(server_id, [admin_user.id] if admin_user else [], log_channel.id if log_channel else None)
                     embed.add_field(name="Configuration Set", value="Configuration options have been successfully set.", inline=False)
                     await interaction.response.send_message(embed=embed)
                     return
 
-                admin_roles, current_log_channel_id, ticket_categories, max_tickets_per_user = config_data
+                admin_roles, current_log_channel_id, ticket_categories, current_max_tickets = config_data
+                updates = {}
 
                 if admin_user:
                     embed.add_field(
@@ -96,15 +97,21 @@ class Config(commands.GroupCog, name="config"):
                         )
                     await interaction.followup.send(embed=embed)
                     if view.value:
-                        update_config(server_id, admin_roles, current_log_channel_id, None)
+                        await update_config_async(server_id, admin_roles)
                     return
 
                 if max_tickets_per_user is not None:
-                    update_config(server_id, max_tickets_per_user=max_tickets_per_user)
+                    updates["max_tickets_per_user"] = max_tickets_per_user
                     embed.add_field(name="Max Tickets Per User Updated",
                                     value=f"Max tickets per user has been set to {max_tickets_per_user}.", inline=False)
                     changes_made = True
 
+                if channel_pool_size is not None:
+                    updates["channel_pool_size"] = channel_pool_size
+                    embed.add_field(name="Channel Pool Size Updated",
+                                    value=f"{channel_pool_size} ticket channels will be kept ready per ticket category.", inline=False)
+                    changes_made = True
+
                 if log_channel:
                     if current_log_channel_id == log_channel.id:
                         embed.add_field(
@@ -124,10 +131,12 @@ class Config(commands.GroupCog, name="config"):
                             value=f"Log channel has been set to <#{log_channel.id}>.",
                             inline=False
                         )
-                    current_log_channel_id = log_channel.id
+                    updates["log_channel_id"] = log_channel.id
                     changes_made = True
                 if changes_made:
-                    update_config(server_id, admin_roles, current_log_channel_id, None)
+                    await update_config_async(server_id, None, **updates)
+                    if "channel_pool_size" in updates:
+                        channel_pool.request_refill(server_id)
 
                     if not interaction.response.is_done():
                         await interaction.response.send_message(embed=embed)
@@ -151,7 +160,7 @@ class Config(commands.GroupCog, name="config"):
                 return
 
             server_id = interaction.guild.id
-            config_data = fetch_config(server_id)
+            config_data = await fetch_config_async(server_id)
             if config_data is None:
                 embed = discord.Embed(
                     title="No Configuration Found",
@@ -194,11 +203,7 @@ class Config(commands.GroupCog, name="config"):
             server_id = interaction.guild.id
             
             if admin_user:
-                admin_users = fetch_admin_role_ids(server_id)
-
-                if admin_user.id not in admin_users:
-                    admin_users.append(admin_user.id)
-                    update_config(server_id, admin_users, None, None)
+                if await add_admin_role_async(server_id, admin_user.id):
                     await interaction.response.send_message(embed=discord.Embed(
                         title="Admin User Added",
                         description=f"User {admin_user.mention} has been added to the list of admins.",
@@ -213,20 +218,21 @@ class Config(commands.GroupCog, name="config"):
                 return
 
             if ticket_category:
-                existing_categories = fetch_ticket_categories(server_id)
-
                 discord_category = discord.utils.get(interaction.guild.categories, name=ticket_category)
 
-                if discord_category and discord_category.id not in existing_categories:
-                    add_ticket_category(server_id, discord_category.id)
+                if discord_category and await add_ticket_category_async(server_id, discord_category.id):
+                    category_indexes.invalidate(server_id)
+                    channel_pool.request_refill(server_id)
                     await interaction.response.send_message(embed=discord.Embed(
                         title="Ticket Category Added",
                         description=f"Category **{discord_category.name}** has been added to the database.",
                         color=discord.Color.green()
                     ))
                 elif not discord_category:
-                    new_category = await interaction.guild.create_category(ticket_category)
-                    add_ticket_category(server_id, new_category.id)
+                    new_category = await rest_scheduler.run(lambda: interaction.guild.create_category(ticket_category), guild_id=server_id, route="category_create")
+                    await add_ticket_category_async(server_id, new_category.id)
+                    category_indexes.invalidate(server_id)
+                    channel_pool.request_refill(server_id)
                     await interaction.response.send_message(embed=discord.Embed(
                         title="Ticket Category Created and Added",
                         description=f"Category **{new_category.name}** has been created and added to the list of categories.",
@@ -252,11 +258,7 @@ class Config(commands.GroupCog, name="config"):
                 return
 
             server_id = interaction.guild.id
-            admin_roles = fetch_admin_role_ids(server_id)
-
-            if admin_user.id in admin_roles:
-                admin_roles.remove(admin_user.id)
-                update_config(server_id, admin_roles, None)
+            if await delete_admin_role_async(server_id, admin_user.id):
                 await interaction.response.send_message(embed=discord.Embed(
                     title="Admin Role Removed",
                     description=f"Role {admin_user.mention} has been removed from the list of admin roles.",
@@ -272,6 +274,58 @@ class Config(commands.GroupCog, name="config"):
         except Exception as e:
             await handle_command_exception(interaction, self.client, "An error occurred while removing the admin role.", e)
 
+    @app_commands.command(name="pool-add", description="Add an admin to the routing pool of a ticket category")
+    async def pool_add(self, interaction: Interaction, admin_user: Member, category: discord.CategoryChannel):
+        try:
+            if not await self._check_permissions(interaction):
+                await interaction.response.send_message(embed=create_error_embed("You don't have permissions to change category pools."))
+                return
+
+            server_id = interaction.guild.id
+            if not await is_ticket_category_async(server_id, category.id):
+                await interaction.response.send_message(embed=create_error_embed(f"Category **{category.name}** is not a ticket category."))
+                return
+
+            if await add_category_admin_async(server_id, category.id, admin_user.id):
+                ticket_router.invalidate_pools(server_id)
+                await interaction.response.send_message(embed=discord.Embed(
+                    title="Category Pool Updated",
+                    description=f"New tickets in **{category.name}** can now be routed to {admin_user.mention}.",
+                    color=discord.Color.green()
+                ))
+            else:
+                await interaction.response.send_message(embed=discord.Embed(
+                    title="Already In Pool",
+                    description=f"{admin_user.mention} is already in the pool for **{category.name}**.",
+                    color=discord.Color.red()
+                ))
+        except Exception as e:
+            await handle_command_exception(interaction, self.client, "An error occurred while updating the category pool.", e)
+
+    @app_commands.command(name="pool-remove", description="Remove an admin from the routing pool of a ticket category")
+    async def pool_remove(self, interaction: Interaction, admin_user: Member, category: discord.CategoryChannel):
+        try:
+            if not await self._check_permissions(interaction):
+                await interaction.response.send_message(embed=create_error_embed("You don't have permissions to change category pools."))
+                return
+
+            server_id = interaction.guild.id
+            if await remove_category_admin_async(server_id, category.id, admin_user.id):
+                ticket_router.invalidate_pools(server_id)
+                await interaction.response.send_message(embed=discord.Embed(
+                    title="Category Pool Updated",
+                    description=f"{admin_user.mention} has been removed from the pool for **{category.name}**.",
+                    color=discord.Color.green()
+                ))
+            else:
+                await interaction.response.send_message(embed=discord.Embed(
+                    title="Not In Pool",
+                    description=f"{admin_user.mention} is not in the pool for **{category.name}**.",
+                    color=discord.Color.red()
+                ))
+        except Exception as e:
+            await handle_command_exception(interaction, self.client, "An error occurred while updating the category pool.", e)
+
 async def setup(client):
     if Config(client).status:
         print(f"[{datetime.datetime.now()}] [\033[1;33mCONSOLE\033[0;0m]: Cog [\033[1;33m{Config.__name__}\033[0;0m] loaded : Status [\033[1;32mEnable\033[0;0m]")
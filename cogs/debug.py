@@ -0,0 +1,88 @@
+import asyncio
+import datetime
+from typing import Dict, Optional
+
+import discord
+from discord.ext import commands
+from discord import app_commands
+
+from db.config_cache import config_cache
+from db.write_behind import write_behind
+from utils.channel_pool import channel_pool
+from utils.embeds import create_error_embed
+from utils.error_handler import handle_command_exception
+from utils.reaction_index import reaction_index
+from utils.rest_scheduler import rest_scheduler
+from utils.role_updates import role_updates
+from utils.ticket_router import ticket_router
+from utils.ticket_timers import ticket_timers
+from utils.timing import latency_stats
+from utils.trigger_matcher import trigger_index
+
+STATS_LOG_INTERVAL = 600
+
+def collect_stats() -> Dict[str, dict]:
+    sections = {
+        "Config cache": config_cache.stats(),
+        "Write-behind queue": write_behind.stats(),
+        "REST scheduler": rest_scheduler.stats(),
+        "Role updates": role_updates.stats(),
+        "Channel pool": channel_pool.stats(),
+        "Ticket timers": ticket_timers.stats(),
+        "Ticket router": ticket_router.stats(),
+        "Reaction roles": reaction_index.stats(),
+        "Triggers": trigger_index.stats()
+    }
+    for operation in latency_stats.operations():
+        sections[f"Latency {operation}"] = {
+            stage: f"avg {entry['avg_ms']:.1f} ms, max {entry['max_ms']:.1f} ms, n={entry['count']}"
+            for stage, entry in latency_stats.stats(operation).items()
+        }
+    return sections
+
+def _format_value(value) -> str:
+    return f"{value:.2f}" if isinstance(value, float) else str(value)
+
+class Debug(commands.GroupCog, name="debug"):
+    def __init__(self, client):
+        self.client = client
+        self.status = True
+        self._log_task: Optional[asyncio.Task] = None
+
+    async def cog_unload(self):
+        if self._log_task is not None:
+            self._log_task.cancel()
+
+    @commands.Cog.listener()
+    async def on_database_ready(self):
+        if self._log_task is None or self._log_task.done():
+            self._log_task = asyncio.create_task(self._log_stats())
+
+    async def _log_stats(self):
+        while not self.client.is_closed():
+            await asyncio.sleep(STATS_LOG_INTERVAL)
+            for name, values in collect_stats().items():
+                line = ", ".join(f"{key}={_format_value(value)}" for key, value in values.items())
+                print(f"[{datetime.datetime.now()}] [\033[1;35mCONSOLE\033[0;0m]: stats [\033[1;35m{name}\033[0;0m] {line}")
+
+    @app_commands.command(name="stats", description="Show internal counters of the bot (owner only)")
+    async def stats(self, interaction: discord.Interaction):
+        try:
+            if not await self.client.is_owner(interaction.user):
+                await interaction.response.send_message(embed=create_error_embed("Only the bot owner can view internal stats."), ephemeral=True)
+                return
+
+            embed = discord.Embed(title="Bot Stats", color=discord.Color.from_rgb(100, 150, 255))
+            for name, values in collect_stats().items():
+                value = "\n".join(f"{key}: {_format_value(item)}" for key, item in values.items()) or "No data yet"
+                embed.add_field(name=name, value=value[:1024], inline=True)
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+        except Exception as e:
+            await handle_command_exception(interaction, self.client, "An error occurred while collecting stats.", e)
+
+async def setup(client):
+    if Debug(client).status:
+        print(f"[{datetime.datetime.now()}] [\033[1;33mCONSOLE\033[0;0m]: Cog [\033[1;33m{Debug.__name__}\033[0;0m] loaded : Status [\033[1;32mEnable\033[0;0m]")
+        await client.add_cog(Debug(client))
+    else:
+        print(f"[{datetime.datetime.now()}] [\033[1;33mCONSOLE\033[0;0m]: Cog [\033[1;33m{Debug.__name__}\033[0;0m] loaded : Status [\033[1;31mUnable\033[0;0m]")
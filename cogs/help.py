@@ -7,17 +7,12 @@ from discord import app_commands
 
 from utils.embeds import create_embed, create_error_embed
 
-import sqlite3
-
 from utils.error_handler import handle_command_exception
 
 class Help(commands.GroupCog, name="help"):
     def __init__(self, client):
         self.client = client
         self.status = True
-        
-        self.db_connection = sqlite3.connect('db/mydatabase.db')
-        self.db_cursor = self.db_connection.cursor()
 
     @app_commands.command(name="commands", description="Displays possible commands for the bot")
     async def commands(self, interaction: discord.Interaction):
@@ -71,7 +66,6 @@ class Help(commands.GroupCog, name="help"):
             await handle_command_exception(
                 interaction,
                 self.client,
-                self.db_cursor,
                 "while using config command",
                 e
             )
@@ -107,7 +101,6 @@ class Help(commands.GroupCog, name="help"):
             await handle_command_exception(
                     interaction,
                     self.client,
-                    self.db_cursor,
                     "while using config command",
                     e
                 )
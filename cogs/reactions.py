@@ -0,0 +1,246 @@
+import datetime
+from typing import Optional
+
+import discord
+from discord.ext import commands
+from discord import app_commands, Color
+
+from utils.embeds import create_error_embed
+from utils.error_handler import handle_command_exception
+from utils.reaction_index import reaction_index, emoji_key
+from utils.rest_scheduler import rest_scheduler, BACKGROUND
+from utils.trigger_matcher import trigger_index, MAX_TRIGGERS_PER_GUILD, MAX_TRIGGER_LENGTH
+from utils.role_updates import role_updates
+
+from db.database import add_reaction_role_async, add_trigger_async, fetch_guild_reaction_roles_async, fetch_guild_triggers_async, fetch_reaction_roles_async, fetch_triggers_async, is_guild_admin_async, remove_reaction_roles_async, remove_trigger_async
+
+class Reactions(commands.GroupCog, name="reacts"):
+    def __init__(self, client):
+        self.client = client
+        self.status = True
+
+    async def cog_unload(self):
+        role_updates.stop()
+
+    @commands.Cog.listener()
+    async def on_database_ready(self):
+        role_updates.start(self.client)
+        if not reaction_index.loaded:
+            reaction_index.load(await fetch_reaction_roles_async())
+        if not trigger_index.loaded:
+            trigger_index.load(await fetch_triggers_async())
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.guild is None or message.author.bot:
+            return
+        for emoji in trigger_index.match(message.guild.id, message.channel.id, message.content):
+            rest_scheduler.schedule(lambda emoji=emoji: message.add_reaction(emoji), guild_id=message.guild.id, route="reaction_add", priority=BACKGROUND)
+
+    async def _check_permissions(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id == interaction.guild.owner_id:
+            return True
+        candidate_ids = [interaction.user.id] + [role.id for role in interaction.user.roles]
+        return await is_guild_admin_async(interaction.guild.id, candidate_ids)
+
+    async def _update_roles(self, payload: discord.RawReactionActionEvent, add: bool):
+        if payload.guild_id is None:
+            return
+        role_id = reaction_index.get(payload.message_id, payload.emoji)
+        if role_id is None or payload.user_id == self.client.user.id:
+            return
+
+        if payload.member is not None and payload.member.bot:
+            return
+        role_updates.request(payload.guild_id, payload.user_id, role_id, add)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        await self._update_roles(payload, add=True)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
+        await self._update_roles(payload, add=False)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        if payload.guild_id is not None and reaction_index.has_message(payload.message_id):
+            reaction_index.remove_message(payload.message_id)
+            await remove_reaction_roles_async(payload.guild_id, payload.message_id)
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        if payload.guild_id is None:
+            return
+        for message_id in payload.message_ids:
+            if reaction_index.has_message(message_id):
+                reaction_index.remove_message(message_id)
+                await remove_reaction_roles_async(payload.guild_id, message_id)
+
+    @app_commands.command(name="add", description="Give a role to members who react to a message")
+    @app_commands.describe(channel="Channel of the message", message_id="ID of the message", emoji="Emoji to react with", role="Role to give", description="Optional note shown in /reacts list")
+    async def add(self, interaction: discord.Interaction, channel: discord.TextChannel, message_id: str, emoji: str, role: discord.Role, description: Optional[str] = None):
+        try:
+            if not await self._check_permissions(interaction):
+                await interaction.response.send_message(embed=create_error_embed("You don't have permissions to manage reaction roles."), ephemeral=True)
+                return
+
+            if not message_id.isdigit():
+                await interaction.response.send_message(embed=create_error_embed("Please provide a valid message ID."), ephemeral=True)
+                return
+
+            if role >= interaction.guild.me.top_role or role.managed:
+                await interaction.response.send_message(embed=create_error_embed(f"I can't assign {role.mention}. Move my role above it first."), ephemeral=True)
+                return
+
+            await interaction.response.defer(thinking=True, ephemeral=True)
+            try:
+                message = await channel.fetch_message(int(message_id))
+                partial_emoji = discord.PartialEmoji.from_str(emoji.strip())
+                await rest_scheduler.run(lambda: message.add_reaction(partial_emoji), guild_id=interaction.guild.id, route="reaction_add")
+            except discord.HTTPException:
+                await interaction.followup.send(embed=create_error_embed("Could not find that message or react to it with this emoji."))
+                return
+
+            key = emoji_key(partial_emoji)
+            react_id = await add_reaction_role_async(interaction.guild.id, channel.id, message.id, key, role.id, description)
+            if react_id is None:
+                await interaction.followup.send(embed=create_error_embed(f"{emoji} already has a reaction role on that message."))
+                return
+
+            reaction_index.add(message.id, key, role.id)
+            embed = discord.Embed(title="Reaction Role Added", description=f"Reacting with {emoji} on [this message]({message.jump_url}) now gives {role.mention}. ID: {react_id}", color=Color.green())
+            await interaction.followup.send(embed=embed)
+        except Exception as e:
+            await handle_command_exception(interaction, self.client, "An error occurred while adding the reaction role.", e)
+
+    @app_commands.command(name="remove", description="Remove a reaction role from a message")
+    @app_commands.describe(message_id="ID of the message", emoji="Emoji to remove, or leave empty to remove all reaction roles from the message")
+    async def remove(self, interaction: discord.Interaction, message_id: str, emoji: Optional[str] = None):
+        try:
+            if not await self._check_permissions(interaction):
+                await interaction.response.send_message(embed=create_error_embed("You don't have permissions to manage reaction roles."), ephemeral=True)
+                return
+
+            if not message_id.isdigit():
+                await interaction.response.send_message(embed=create_error_embed("Please provide a valid message ID."), ephemeral=True)
+                return
+
+            key = emoji_key(emoji) if emoji else None
+            removed = await remove_reaction_roles_async(interaction.guild.id, int(message_id), key)
+            if removed:
+                if key is None:
+                    reaction_index.remove_message(int(message_id))
+                else:
+                    reaction_index.remove(int(message_id), key)
+                embed = discord.Embed(title="Reaction Role Removed", description=f"Removed {removed} reaction role(s) from message {message_id}.", color=Color.green())
+            else:
+                embed = create_error_embed("No matching reaction role was found.")
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+        except Exception as e:
+            await handle_command_exception(interaction, self.client, "An error occurred while removing the reaction role.", e)
+
+    @app_commands.command(name="list", description="List reaction roles in this server")
+    async def list_reacts(self, interaction: discord.Interaction):
+        try:
+            rows = await fetch_guild_reaction_roles_async(interaction.guild.id)
+            if not rows:
+                await interaction.response.send_message(embed=discord.Embed(title="No Reaction Roles", description="This server has no reaction roles.", color=Color.red()), ephemeral=True)
+                return
+
+            embed = discord.Embed(title="Reaction Roles", color=Color.teal())
+            for react_id, channel_id, message_id, react_emoji, role_id, description in rows[:25]:
+                emoji = self.client.get_emoji(int(react_emoji)) if react_emoji.isdigit() else react_emoji
+                value = f"{emoji or react_emoji} → <@&{role_id}> in <#{channel_id}> (message {message_id})"
+                if description:
+                    value += f"\n{description}"
+                embed.add_field(name=f"#{react_id}", value=value, inline=False)
+            if len(rows) > 25:
+                embed.set_footer(text=f"Showing 25 of {len(rows)} reaction roles")
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+        except Exception as e:
+            await handle_command_exception(interaction, self.client, "An error occurred while listing reaction roles.", e)
+
+    @app_commands.command(name="trigger-add", description="React with an emoji to messages containing a keyword or mention")
+    @app_commands.describe(keyword="Word, phrase or mention to look for", emoji="Emoji to react with", channel="Only watch this channel", description="Optional note shown in /reacts triggers")
+    async def trigger_add(self, interaction: discord.Interaction, keyword: str, emoji: str, channel: Optional[discord.TextChannel] = None, description: Optional[str] = None):
+        try:
+            if not await self._check_permissions(interaction):
+                await interaction.response.send_message(embed=create_error_embed("You don't have permissions to manage triggers."), ephemeral=True)
+                return
+
+            keyword = keyword.strip().casefold()
+            if not keyword or len(keyword) > MAX_TRIGGER_LENGTH:
+                await interaction.response.send_message(embed=create_error_embed(f"Keywords must be between 1 and {MAX_TRIGGER_LENGTH} characters."), ephemeral=True)
+                return
+
+            if trigger_index.count(interaction.guild.id) >= MAX_TRIGGERS_PER_GUILD:
+                await interaction.response.send_message(embed=create_error_embed(f"This server already has the maximum of {MAX_TRIGGERS_PER_GUILD} triggers."), ephemeral=True)
+                return
+
+            emoji = str(discord.PartialEmoji.from_str(emoji.strip()))
+            channel_id = channel.id if channel else None
+            react_id = await add_trigger_async(interaction.guild.id, channel_id, keyword, emoji, description)
+            if react_id is None:
+                await interaction.response.send_message(embed=create_error_embed(f"A trigger for `{keyword}` already exists."), ephemeral=True)
+                return
+
+            trigger_index.add(interaction.guild.id, react_id, keyword, emoji, channel_id)
+            where = f" in {channel.mention}" if channel else ""
+            embed = discord.Embed(title="Trigger Added", description=f"Messages containing `{keyword}`{where} will get a {emoji} reaction. ID: {react_id}", color=Color.green())
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+        except Exception as e:
+            await handle_command_exception(interaction, self.client, "An error occurred while adding the trigger.", e)
+
+    @app_commands.command(name="trigger-remove", description="Remove a keyword or mention trigger")
+    @app_commands.describe(keyword="Keyword of the trigger to remove")
+    async def trigger_remove(self, interaction: discord.Interaction, keyword: str):
+        try:
+            if not await self._check_permissions(interaction):
+                await interaction.response.send_message(embed=create_error_embed("You don't have permissions to manage triggers."), ephemeral=True)
+                return
+
+            keyword = keyword.strip().casefold()
+            react_id = await remove_trigger_async(interaction.guild.id, keyword)
+            if react_id is None:
+                await interaction.response.send_message(embed=create_error_embed(f"No trigger for `{keyword}` was found."), ephemeral=True)
+                return
+
+            trigger_index.remove(interaction.guild.id, react_id)
+            embed = discord.Embed(title="Trigger Removed", description=f"The trigger for `{keyword}` has been removed.", color=Color.green())
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+        except Exception as e:
+            await handle_command_exception(interaction, self.client, "An error occurred while removing the trigger.", e)
+
+    @app_commands.command(name="triggers", description="List keyword and mention triggers in this server")
+    async def list_triggers(self, interaction: discord.Interaction):
+        try:
+            rows = await fetch_guild_triggers_async(interaction.guild.id)
+            if not rows:
+                await interaction.response.send_message(embed=discord.Embed(title="No Triggers", description="This server has no triggers.", color=Color.red()), ephemeral=True)
+                return
+
+            lines = []
+            for react_id, channel_id, keyword, react_emoji, description in rows:
+                line = f"`{keyword}` → {react_emoji}" + (f" in <#{channel_id}>" if channel_id else "")
+                if description:
+                    line += f" - {description}"
+                lines.append(line)
+
+            description = ""
+            for line in lines:
+                if len(description) + len(line) + 1 > 4000:
+                    break
+                description += line + "\n"
+            embed = discord.Embed(title="Triggers", description=description, color=Color.teal())
+            embed.set_footer(text=f"{len(rows)} of {MAX_TRIGGERS_PER_GUILD} triggers used")
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+        except Exception as e:
+            await handle_command_exception(interaction, self.client, "An error occurred while listing triggers.", e)
+
+async def setup(client):
+    if Reactions(client).status:
+        print(f"[{datetime.datetime.now()}] [\033[1;33mCONSOLE\033[0;0m]: Cog [\033[1;33m{Reactions.__name__}\033[0;0m] loaded : Status [\033[1;32mEnable\033[0;0m]")
+        await client.add_cog(Reactions(client))
+    else:
+        print(f"[{datetime.datetime.now()}] [\033[1;33mCONSOLE\033[0;0m]: Cog [\033[1;33m{Reactions.__name__}\033[0;0m] loaded : Status [\033[1;31mUnable\033[0;0m]")
@@ -1,6 +1,9 @@
+import asyncio
 import datetime
 import json
-from typing import Optional, List
+import os
+import time
+from typing import Literal, Optional, List, Tuple
 
 import discord
 from discord.ext import commands
@@ -8,65 +11,321 @@ from discord import app_commands, Color
 
 from utils.embeds import create_error_embed
 from utils.error_handler import handle_command_exception
-
-from db.database import execute_select, execute_query, fetch_admin_role_ids, fetch_config, generate_ticket_id
+from utils.category_index import category_indexes
+from utils.timing import StageTimer
+from utils.channel_pool import channel_pool
+from utils.rest_scheduler import rest_scheduler, BACKGROUND, INTERACTIVE
+from utils.transcripts import export_transcript, transcript_file
+from utils.ticket_timers import ticket_timers, REMINDER_AFTER, AUTO_CLOSE_AFTER
+from utils.ticket_router import ticket_router
+from utils.sharding import owns_guild
+
+from db.database import TicketLimitReached, assign_ticket_async, close_ticket_async, close_tickets_async, create_ticket_async, escalate_ticket_priority_async, fetch_ticket_async, fetch_ticket_messages_async, execute_select_async, get_open_ticket_count, fetch_config_async, fetch_owner_ticket_count_async, fetch_ticket_categories_async, fetch_ticket_page_async, fetch_ticket_stats_async, fetch_pending_archives_async, finish_pending_archive_async, generate_ticket_id_async, search_tickets_async, get_log_channel_id_async, save_transcript_async, is_guild_admin_async, is_ticket_category_async
+from db.write_behind import record_ticket_event, record_ticket_message
+from db.stats import median_close_seconds
+
+TICKETS_PER_PAGE = 5
+MESSAGES_PER_PAGE = 10
+BULK_DELETE_DELAY = 1.0
+BULK_PROGRESS_INTERVAL = 3.0
+ARCHIVE_SWEEP_INTERVAL = 900
+ARCHIVE_SWEEP_BATCH = 50
+
+class TicketPageView(discord.ui.View):
+    def __init__(self, user_id: int, server_id: int, page: int, total_tickets: int, tickets: list):
+        super().__init__(timeout=120.0)
+        self.user_id = user_id
+        self.server_id = server_id
+        self.page = page
+        self.total_tickets = total_tickets
+        self.tickets = tickets
+        self._update_buttons()
+
+    @property
+    def total_pages(self) -> int:
+        return max((self.total_tickets + TICKETS_PER_PAGE - 1) // TICKETS_PER_PAGE, 1)
+
+    def build_embed(self) -> discord.Embed:
+        embed = discord.Embed(title=f"Tickets - Page {self.page}", color=Color.teal())
+        for ticket in self.tickets:
+            ticket_id, title, description, created_at, status = ticket
+            embed.add_field(
+                name=f"Ticket #{ticket_id}",
+                value=f"Title: {title}\nDescription: {description}\nCreated on: {created_at}\nStatus: {status}",
+                inline=False
+            )
+        embed.set_footer(text=f"Page {self.page} of {self.total_pages}")
+        return embed
+
+    def _update_buttons(self):
+        self.previous_button.disabled = self.page <= 1
+        self.next_button.disabled = self.page >= self.total_pages
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.user_id
+
+    async def _show(self, interaction: discord.Interaction, tickets: list, page: int):
+        if tickets:
+            self.tickets = tickets
+            self.page = page
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.grey)
+    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        tickets = await fetch_ticket_page_async(self.server_id, self.user_id, TICKETS_PER_PAGE, before=self.tickets[0][0])
+        await self._show(interaction, tickets, self.page - 1)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.grey)
+    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        tickets = await fetch_ticket_page_async(self.server_id, self.user_id, TICKETS_PER_PAGE, after=self.tickets[-1][0])
+        await self._show(interaction, tickets, self.page + 1)
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 86400:
+        return f"{seconds / 86400:.1f}d"
+    if seconds >= 3600:
+        return f"{seconds / 3600:.1f}h"
+    return f"{seconds // 60}m"
+
+class TicketSearchView(discord.ui.View):
+    def __init__(self, user_id: int, server_id: int, query: str, results: list):
+        super().__init__(timeout=120.0)
+        self.user_id = user_id
+        self.server_id = server_id
+        self.query = query
+        self.page = 1
+        self._set_results(results)
+
+    def _set_results(self, results: list):
+        self.has_next = len(results) > TICKETS_PER_PAGE
+        self.results = results[:TICKETS_PER_PAGE]
+        self.previous_button.disabled = self.page <= 1
+        self.next_button.disabled = not self.has_next
+
+    def build_embed(self) -> discord.Embed:
+        embed = discord.Embed(title=f"Search: {self.query}"[:256], color=Color.teal())
+        for ticket_id, title, description, created_at, status in self.results:
+            embed.add_field(
+                name=f"Ticket #{ticket_id}",
+                value=f"Title: {title}\nDescription: {(description or '')[:200]}\nCreated on: {created_at}\nStatus: {status}",
+                inline=False
+            )
+        embed.set_footer(text=f"Page {self.page}")
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.user_id
+
+    async def _show(self, interaction: discord.Interaction, page: int):
+        results = await search_tickets_async(self.server_id, self.query, TICKETS_PER_PAGE + 1, (page - 1) * TICKETS_PER_PAGE)
+        if results:
+            self.page = page
+            self._set_results(results)
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.grey)
+    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.page - 1)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.grey)
+    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.page + 1)
+
+class TicketHistoryView(discord.ui.View):
+    def __init__(self, user_id: int, ticket_id: int, messages: list):
+        super().__init__(timeout=120.0)
+        self.user_id = user_id
+        self.ticket_id = ticket_id
+        self.messages = messages
+        self.page = 1
+        self.at_end = len(messages) < MESSAGES_PER_PAGE
+        self._update_buttons()
+
+    def build_embed(self) -> discord.Embed:
+        embed = discord.Embed(title=f"Ticket #{self.ticket_id} - History", color=Color.teal())
+        for message_row_id, author_id, created_at, content, attachments in self.messages:
+            attachment_urls = json.loads(attachments) if attachments else []
+            value = (content or "*no text*")[:900]
+            if attachment_urls:
+                value += "\n" + "\n".join(attachment_urls)[:100]
+            embed.add_field(name=f"{created_at} - {author_id}", value=value, inline=False)
+        embed.set_footer(text=f"Page {self.page}")
+        return embed
+
+    def _update_buttons(self):
+        self.older_button.disabled = self.page <= 1
+        self.newer_button.disabled = self.at_end
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.user_id
+
+    @discord.ui.button(label="Older", style=discord.ButtonStyle.grey)
+    async def older_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        first = self.messages[0]
+        messages = await fetch_ticket_messages_async(self.ticket_id, MESSAGES_PER_PAGE, before=(first[2], first[0]))
+        if messages:
+            self.messages = messages
+            self.page -= 1
+            self.at_end = False
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    @discord.ui.button(label="Newer", style=discord.ButtonStyle.grey)
+    async def newer_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        last = self.messages[-1]
+        messages = await fetch_ticket_messages_async(self.ticket_id, MESSAGES_PER_PAGE, after=(last[2], last[0]))
+        if messages:
+            self.messages = messages
+            self.page += 1
+        self.at_end = len(messages or []) < MESSAGES_PER_PAGE
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
 
 class Tickets(commands.GroupCog, name="tickets"):
     def __init__(self, client):
         self.client = client
         self.status = True
+        self._bulk_jobs = set()
+        self._archiving = set()
+        self._sweep_task: Optional[asyncio.Task] = None
+
+    async def cog_unload(self):
+        channel_pool.stop()
+        ticket_timers.stop()
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+
+    @commands.Cog.listener()
+    async def on_database_ready(self):
+        channel_pool.start(self.client)
+        owns = lambda server_id: owns_guild(self.client, server_id)
+        await ticket_timers.start(self._on_ticket_timer, owns=owns)
+        await ticket_router.start(owns=owns)
+        if self._sweep_task is None or self._sweep_task.done():
+            self._sweep_task = asyncio.create_task(self._sweep_archives())
+
+    async def _sweep_archives(self):
+        while not self.client.is_closed():
+            await asyncio.sleep(ARCHIVE_SWEEP_INTERVAL)
+            shard_ids = self.client.shard_ids if self.client.shard_count else None
+            for ticket_id, server_id, channel_id in await fetch_pending_archives_async(ARCHIVE_SWEEP_BATCH, self.client.shard_count, shard_ids):
+                guild = self.client.get_guild(server_id)
+                if guild is None or ticket_id in self._archiving:
+                    continue
+                channel = guild.get_channel(int(channel_id)) if channel_id else None
+                if channel is None:
+                    await finish_pending_archive_async(ticket_id, archived=True)
+                    continue
+                try:
+                    archived = await self._archive_and_delete(guild, channel, ticket_id, priority=BACKGROUND)
+                except Exception as e:
+                    print(f"Error retrying archive of ticket {ticket_id}: {e}")
+                    archived = False
+                if not archived:
+                    await finish_pending_archive_async(ticket_id, archived=False)
+                await asyncio.sleep(BULK_DELETE_DELAY)
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.guild is None:
+            return
+        ticket = ticket_timers.ticket_for_channel(message.channel.id)
+        if ticket is None:
+            return
+        await record_ticket_message(ticket[1], message.id, message.author.id, message.created_at.isoformat(), message.content,
+                                    [attachment.url for attachment in message.attachments])
+        if not message.author.bot:
+            await ticket_timers.touch(message.channel.id)
+
+    async def _on_ticket_timer(self, server_id: int, ticket_id: int, channel_id: int, action: str):
+        guild = self.client.get_guild(server_id)
+        channel = guild.get_channel(channel_id) if guild else None
+        ticket = await fetch_ticket_async(server_id, ticket_id)
+        if ticket is None or ticket[2] == "closed":
+            await ticket_timers.forget(ticket_id)
+            ticket_router.release(ticket_id)
+            return
+        owner_id = ticket[0]
+
+        if action == "reminder" and channel:
+            embed = discord.Embed(
+                title="Ticket Idle",
+                description=f"This ticket has had no activity for {REMINDER_AFTER // 3600} hours. It will be closed automatically after {AUTO_CLOSE_AFTER // 3600} hours of inactivity.",
+                color=Color.orange()
+            )
+            await rest_scheduler.run(lambda: channel.send(content=f"<@{owner_id}>", embed=embed), guild_id=server_id, route="channel_send", priority=BACKGROUND)
+        elif action == "escalate":
+            priority = await escalate_ticket_priority_async(server_id, ticket_id)
+            if priority:
+                ticket_router.reweight(ticket_id, priority)
+            if channel and priority:
+                embed = discord.Embed(title="Ticket Escalated", description=f"Ticket #{ticket_id} priority raised to **{priority}**.", color=Color.orange())
+                await rest_scheduler.run(lambda: channel.send(embed=embed), guild_id=server_id, route="channel_send", priority=BACKGROUND)
+        elif action == "auto_close":
+            if await close_ticket_async(server_id, ticket_id, owner_id) > 0:
+                await record_ticket_event(server_id, ticket_id, None, "auto_closed")
+                await ticket_timers.forget(ticket_id)
+                ticket_router.release(ticket_id)
+                if channel:
+                    await self._archive_and_delete(guild, channel, ticket_id, priority=BACKGROUND)
 
     async def autocomplete_category(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
         try:
-            server_id = interaction.guild.id
-            query = "SELECT tickets_categories FROM config WHERE server_id = ?"
-            data = execute_select(query, (server_id,))
-
-            if data and data[0]:
-                category_ids = json.loads(data[0][0])
-
-                guild = interaction.guild
-                categories = [
-                    (category.id, category.name)
-                    for category in guild.categories
-                    if category.id in category_ids and str(category.id).startswith(current)
-                ]
-
-                return [
-                    app_commands.Choice(name=name, value=str(id))
-                    for id, name in categories[:25]
-                ]
-                
+            guild = interaction.guild
+            index = category_indexes.get(guild.id)
+            if index is None:
+                category_ids = await fetch_ticket_categories_async(guild.id)
+                index = category_indexes.build(guild, category_ids or [])
+
+            return [
+                app_commands.Choice(name=name, value=str(id))
+                for name, id in index.search(current)
+            ]
         except Exception as e:
             print(f"Error in autocomplete_category: {e}")
             return []
 
-    async def create_ticket_channel(self, guild: discord.Guild, category_id: int, channel_name: str, user_id: int) -> discord.TextChannel:
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
+        if isinstance(channel, discord.CategoryChannel):
+            category_indexes.channel_changed(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        if isinstance(after, discord.CategoryChannel) and before.name != after.name:
+            category_indexes.channel_changed(after)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        if isinstance(channel, discord.CategoryChannel):
+            category_indexes.channel_deleted(channel)
+        else:
+            channel_pool.forget(channel)
+
+    async def create_ticket_channel(self, guild: discord.Guild, category_id: int, channel_name: str, member: discord.Member, admin_role_ids: List[int]) -> discord.TextChannel:
         try:
             category = discord.utils.get(guild.categories, id=category_id)
             if not category:
                 raise ValueError("Category not found")
 
-            channel = await guild.create_text_channel(name=channel_name, category=category)
-
             permissions = {
                 guild.default_role: discord.PermissionOverwrite(read_messages=False),
                 guild.me: discord.PermissionOverwrite(read_messages=True, send_messages=True)
             }
 
-            admin_role_ids = fetch_admin_role_ids(guild.id)
-
             for admin_role_id in admin_role_ids:
-                member = guild.get_member(admin_role_id)
-                if member:
-                    permissions[member] = discord.PermissionOverwrite(read_messages=True, send_messages=True, view_channel=True)
+                admin = guild.get_member(admin_role_id)
+                if admin:
+                    permissions[admin] = discord.PermissionOverwrite(read_messages=True, send_messages=True, view_channel=True)
 
-            member = guild.get_member(user_id)
             permissions[member] = discord.PermissionOverwrite(read_messages=True, send_messages=True, view_channel=True)
 
-            await channel.edit(overwrites=permissions)
-
-            return channel
+            channel = await channel_pool.claim(guild, category_id, channel_name, permissions)
+            if channel is not None:
+                return channel
+            return await rest_scheduler.run(lambda: guild.create_text_channel(name=channel_name, category=category, overwrites=permissions), guild_id=guild.id, route="channel_create")
         except Exception as e:
             print(f"Error in create_ticket_channel: {e}")
 
@@ -75,149 +334,209 @@ class Tickets(commands.GroupCog, name="tickets"):
     @app_commands.autocomplete(category=autocomplete_category)
     async def create(self, interaction: discord.Interaction, title: str, description: str, category: str):
         try:
+            await interaction.response.defer(thinking=True)
+            timer = StageTimer("tickets.create")
+
             server_id = interaction.guild.id
             user_id = interaction.user.id
             creation_date = datetime.datetime.utcnow().isoformat()
 
-            query = "SELECT max_tickets_per_user"
-
-            query = "SELECT tickets_categories, max_tickets_per_user FROM config WHERE server_id = ?"
-            data = execute_select(query, (server_id,))
+            data = await fetch_config_async(server_id)
+            if not data:
+                embed = create_error_embed(f"No configuration found for this server. Please configure the bot. Use command /help config.")
+                await interaction.followup.send(embed=embed)
+                return
 
-            max_tickets_per_user = data[0][1]
-            print(max_tickets_per_user)
+            admin_role_ids, log_channel_id, tickets_categories, max_tickets_per_user = data
 
-            countQuery = "SELECT COUNT(*) FROM tickets WHERE owner = ? AND server_id = ? and status != 'closed'"
-            countQueryData = execute_select(countQuery, (user_id, server_id))
-            ticketsPerUser =countQueryData[0][0]
+            ticketsPerUser = get_open_ticket_count(server_id, user_id)
 
-            if max_tickets_per_user > ticketsPerUser:
+            if max_tickets_per_user is None or max_tickets_per_user > ticketsPerUser:
                 pass
             else:
                 embed = create_error_embed("Maximum number of tickets open to the user has been reached")
-                await interaction.response.send_message(embed=embed)
+                await interaction.followup.send(embed=embed)
                 return
 
-            exist = False
-            if data and data[0]:
-                tickets_cateegories = json.loads(data[0][0])
-                for category_in_db in tickets_cateegories:
-                    clean_category = str(category_in_db)
-                    print(clean_category)
-                    if clean_category == category:
-                        exist = True
-                        break
-
-            if not exist:
-                embed = create_error_embed(f"choose correct category from server config")
-                await interaction.response.send_message(embed=embed)
-                return
-
-            data = fetch_config(server_id)
-            if not data:
-                embed = create_error_embed(f"No configuration found for this server. Please configure the bot. Use command /help config.")
-                await interaction.response.send_message(embed=embed)
-                return
-
-            admin_role_ids, log_channel_id, tickets_categories, max_tickets_per_user = data
-
-            if int(category) not in tickets_categories:
+            if not category.isdigit() or not await is_ticket_category_async(server_id, int(category)):
                 embed = create_error_embed(f"The category '{category}' does not exist. Please select a valid category.")
-                await interaction.response.send_message(embed=embed)
+                await interaction.followup.send(embed=embed)
                 return
 
-            ticket_id = generate_ticket_id()
+            ticket_id = await generate_ticket_id_async()
+            timer.mark("db_check")
+
             category_name = discord.utils.get(interaction.guild.categories, id=int(category)).name
             channel_name = f"ticket-{ticket_id}"
-            # channel_id = interaction.channel.id
 
-            channel = await self.create_ticket_channel(interaction.guild, int(category), channel_name, user_id)
+            assigned_to = await ticket_router.route(interaction.guild, int(category))
+            if assigned_to is not None:
+                ticket_router.assign(server_id, ticket_id, assigned_to)
+                admin_role_ids = list(set(admin_role_ids) | {assigned_to})
+
+            channel = await self.create_ticket_channel(interaction.guild, int(category), channel_name, interaction.user, admin_role_ids)
+            if channel is None:
+                ticket_router.release(ticket_id)
+                embed = create_error_embed("Failed to create the ticket channel. Please try again.")
+                await interaction.followup.send(embed=embed)
+                return
+            timer.mark("channel_create")
+
             channel_id = channel.id
-            insert_query = """
-                INSERT INTO tickets (server_id, channel_id, ticket_id, title, description, category, created_at, owner)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """
-            execute_query(insert_query, (server_id, channel_id, ticket_id, title, description, int(category), creation_date, user_id))
-
-            insert_permission_query = """
-                INSERT INTO ticket_permissions (ticket_id, user_id, role)
-                VALUES (?, ?, 'user')
-            """
-            execute_query(insert_permission_query, (ticket_id, user_id))
+            try:
+                created = await create_ticket_async(server_id, ticket_id, channel_id, title, description, int(category), creation_date, user_id, admin_role_ids, assigned_to, max_open=max_tickets_per_user)
+                error = "Failed to save the ticket. Please try again."
+            except TicketLimitReached:
+                created = False
+                error = "Maximum number of tickets open to the user has been reached"
+            if not created:
+                ticket_router.release(ticket_id)
+                rest_scheduler.schedule(channel.delete, guild_id=server_id, route="channel_delete")
+                embed = create_error_embed(error)
+                await interaction.followup.send(embed=embed)
+                return
+            await record_ticket_event(server_id, ticket_id, user_id, "created")
+            await ticket_timers.track(server_id, ticket_id, channel_id)
+            timer.mark("db_insert")
 
-            for admin_role_id in admin_role_ids:
-                execute_query(insert_permission_query, (ticket_id, admin_role_id))
+            if assigned_to is not None:
+                rest_scheduler.schedule(lambda: channel.send(content=f"Ticket #{ticket_id} has been assigned to <@{assigned_to}>."), guild_id=server_id, route="channel_send")
 
             embed = discord.Embed(
                 title="New Ticket Created",
                 description=f"Your ticket has been created successfully in category **{category_name}**. Ticket ID: {ticket_id}. Channel: {channel.mention}",
                 color=discord.Color.green()
             )
-            await interaction.response.send_message(embed=embed)
+            await interaction.followup.send(embed=embed)
+            timer.mark("response")
+            timer.finish()
 
         except Exception as e:
-            await handle_command_exception(interaction, self.client, None, "An error occurred while creating the ticket.", e)
+            await handle_command_exception(interaction, self.client, "An error occurred while creating the ticket.", e)
     @app_commands.command(name="view", description="View your tickets")
     async def view(self, interaction: discord.Interaction, page: int = 1):
         try:
             server_id = interaction.guild.id
             user_id = interaction.user.id
 
-            tickets_per_page = 5
-            offset = (page -1) * tickets_per_page
-
-            query = "SELECT ticket_id, title, description, created_at, status FROM tickets WHERE server_id = ? and owner = ? LIMIT ? OFFSET ?"
-            tickets = execute_select(query, (server_id, user_id, tickets_per_page, offset))
+            page = max(page, 1)
+            offset = (page - 1) * TICKETS_PER_PAGE
+            tickets = await fetch_ticket_page_async(server_id, user_id, TICKETS_PER_PAGE, offset=offset)
 
             if tickets:
-                embed = discord.Embed(title=f"Tickets - Page {page}", color=Color.teal())
-                for ticket in tickets:
-                    ticket_id, title, description, created_at, status = ticket
-                    embed.add_field(
-                        name=f"Ticket #{ticket_id}",
-                        value=f"Title: {title}\nDescription: {description}\nCreated on: {created_at}\nStatus: {status}",
-                        inline=False
-                    )
-                next_query = "SELECT COUNT(*) FROM tickets WHERE server_id = ? and owner = ?"
-                total_tickets = execute_select(next_query, (server_id, user_id))[0][0]
-                total_pages = (total_tickets + tickets_per_page - 1) // tickets_per_page
-
-                embed.set_footer(text=f"Page {page} of {total_pages}")
-
+                total_tickets = await fetch_owner_ticket_count_async(server_id, user_id)
+                view = TicketPageView(interaction.user.id, server_id, page, total_tickets, tickets)
+                await interaction.response.send_message(embed=view.build_embed(), view=view)
             else:
                 embed = discord.Embed(title="No Tickets Found", description="There are no tickets for this server.", color=Color.red())
+                await interaction.response.send_message(embed=embed)
+        except Exception as e:
+            await handle_command_exception(interaction, self.client, "An error occurred while viewing tickets.", e)
+
+    @app_commands.command(name="search", description="Search tickets by title, description and messages")
+    @app_commands.describe(query="Words to search for")
+    async def search(self, interaction: discord.Interaction, query: str):
+        try:
+            if not await self._is_admin(interaction):
+                embed = discord.Embed(title="Failure", description="You do not have permission to search tickets.", color=Color.red())
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+                return
 
-            await interaction.response.send_message(embed=embed)
+            results = await search_tickets_async(interaction.guild.id, query, TICKETS_PER_PAGE + 1)
+            if results:
+                view = TicketSearchView(interaction.user.id, interaction.guild.id, query, results)
+                await interaction.response.send_message(embed=view.build_embed(), view=view, ephemeral=True)
+            else:
+                embed = discord.Embed(title="No Tickets Found", description="No tickets match your search.", color=Color.red())
+                await interaction.response.send_message(embed=embed, ephemeral=True)
         except Exception as e:
-            await handle_command_exception(interaction, self.client, None, "An error occurred while viewing tickets.", e)
+            await handle_command_exception(interaction, self.client, "An error occurred while searching tickets.", e)
+
+    @app_commands.command(name="stats", description="Show ticket statistics for this server")
+    @app_commands.describe(days="Number of days to include")
+    async def stats(self, interaction: discord.Interaction, days: app_commands.Range[int, 1, 90] = 7):
+        try:
+            if not await self._is_admin(interaction):
+                embed = discord.Embed(title="Failure", description="You do not have permission to view ticket statistics.", color=Color.red())
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+                return
+
+            stats = await fetch_ticket_stats_async(interaction.guild.id, days)
+            if stats is None:
+                embed = create_error_embed("Could not load ticket statistics.")
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+                return
+
+            embed = discord.Embed(title="Ticket Statistics", description=f"Last {days} days: {stats['created']} created, {stats['closed']} closed.", color=Color.teal())
+
+            open_lines = []
+            for category_id, open_count in stats["open_by_category"][:10]:
+                category = interaction.guild.get_channel(category_id)
+                open_lines.append(f"{category.name if category else category_id}: {open_count}")
+            embed.add_field(name="Open Tickets by Category", value="\n".join(open_lines) or "None", inline=False)
+
+            hourly = "\n".join(f"{hour[-2:]}:00  +{created} / -{closed}" for hour, created, closed in stats["hourly"])
+            embed.add_field(name="Created / Closed per Hour (24h, UTC)", value=f"```{hourly}```" if hourly else "No activity", inline=False)
+
+            median = median_close_seconds(stats["close_buckets"])
+            if median is not None:
+                average = stats["close_seconds"] / stats["closed"] if stats["closed"] else 0
+                embed.add_field(name="Time to Close", value=f"Median: ~{format_duration(median)}\nAverage: {format_duration(average)}", inline=False)
+            else:
+                embed.add_field(name="Time to Close", value="No closed tickets", inline=False)
+
+            admin_lines = [f"<@{admin_id}>: {closed} closed" for admin_id, closed in stats["admin_load"]]
+            embed.add_field(name="Admin Load", value="\n".join(admin_lines) or "None", inline=False)
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+        except Exception as e:
+            await handle_command_exception(interaction, self.client, "An error occurred while loading ticket statistics.", e)
+
+    @app_commands.command(name="history", description="View the message history of a ticket")
+    async def history(self, interaction: discord.Interaction, ticket_id: int):
+        try:
+            server_id = interaction.guild.id
+            ticket = await fetch_ticket_async(server_id, ticket_id)
+            if ticket is None:
+                embed = discord.Embed(title="Failure", description="Ticket not found.", color=Color.red())
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+                return
+
+            if ticket[0] != interaction.user.id and not await self._is_admin(interaction):
+                embed = discord.Embed(title="Failure", description="You are not assigned to this ticket.", color=Color.red())
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+                return
+
+            messages = await fetch_ticket_messages_async(ticket_id, MESSAGES_PER_PAGE)
+            if messages:
+                view = TicketHistoryView(interaction.user.id, ticket_id, messages)
+                await interaction.response.send_message(embed=view.build_embed(), view=view, ephemeral=True)
+            else:
+                embed = discord.Embed(title="No Messages Found", description=f"Ticket #{ticket_id} has no recorded messages.", color=Color.red())
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+        except Exception as e:
+            await handle_command_exception(interaction, self.client, "An error occurred while viewing the ticket history.", e)
 
     @app_commands.command(name="close", description="Close a ticket")
     async def close(self, interaction: discord.Interaction, ticket_id: int):
         try:
+            await interaction.response.defer(thinking=True)
             server_id = interaction.guild.id
             user_id = interaction.user.id
 
-            query = "SELECT admin_role_ids, log_channel_id, tickets_categories FROM config WHERE server_id = ?"
-            data = execute_select(query, (server_id,))
-
+            data = await fetch_config_async(server_id)
             if not data:
                 embed = create_error_embed(f"No configuration found for this server. Please configure the bot. Use command /help config.")
-                await interaction.response.send_message(embed=embed)
+                await interaction.followup.send(embed=embed)
                 return
 
-            admin_role_ids = json.loads(data[0][0])
-
-            is_admin = False
-            for admin_role_id in admin_role_ids:
-                if user_id == admin_role_id:
-                    is_admin = True
+            is_admin = await self._is_admin(interaction)
 
             query = "SELECT owner, channel_id, status FROM tickets WHERE server_id = ? AND ticket_id = ?"
-            result = execute_select(query, (server_id, ticket_id))
+            result = await execute_select_async(query, (server_id, ticket_id))
 
             if not result:
                 embed = discord.Embed(title="Failure", description="Ticket not found.", color=Color.red())
-                await interaction.response.send_message(embed=embed)
+                await interaction.followup.send(embed=embed)
                 return
 
             owner_id = result[0][0]
@@ -226,32 +545,237 @@ class Tickets(commands.GroupCog, name="tickets"):
 
             if owner_id != user_id and not is_admin:
                 embed = discord.Embed(title="Failure", description="You are not assigned to this ticket.", color=Color.red())
-                await interaction.response.send_message(embed=embed)
+                await interaction.followup.send(embed=embed)
                 return
 
             if status == "closed":
-                embed = discord.Embed(title="Failure", description="Ticket already closed.", color=Color.red())
-                await interaction.response.send_message(embed=embed)
+                channel = interaction.guild.get_channel(int(channel_id))
+                if channel is None:
+                    embed = discord.Embed(title="Failure", description="Ticket already closed.", color=Color.red())
+                elif await self._archive_and_delete(interaction.guild, channel, ticket_id):
+                    embed = discord.Embed(title="Ticket Closed", description=f"Ticket #{ticket_id} was already closed. Its transcript has now been exported and the channel deleted.", color=Color.green())
+                else:
+                    embed = discord.Embed(title="Failure", description=f"Ticket #{ticket_id} is closed, but its transcript still could not be exported so the channel was kept.", color=Color.red())
+                await interaction.followup.send(embed=embed)
                 return
 
-            update_query = "UPDATE tickets SET status = 'closed' WHERE server_id = ? AND ticket_id = ? and owner = ?"
-            rowcount = execute_query(update_query, (server_id, ticket_id, owner_id))
+            rowcount = await close_ticket_async(server_id, ticket_id, owner_id, user_id)
 
             if rowcount > 0:
+                await record_ticket_event(server_id, ticket_id, user_id, "closed")
+                await ticket_timers.forget(ticket_id)
+                ticket_router.release(ticket_id)
                 channel = interaction.guild.get_channel(int(channel_id))
                 if channel:
                     try:
-                        await channel.delete()
-                        embed = discord.Embed(title="Ticket Closed", description=f"Ticket #{ticket_id} has been closed.", color=Color.green())
+                        if await self._archive_and_delete(interaction.guild, channel, ticket_id):
+                            embed = discord.Embed(title="Ticket Closed", description=f"Ticket #{ticket_id} has been closed.", color=Color.green())
+                        else:
+                            embed = discord.Embed(title="Failure", description=f"Ticket #{ticket_id} has been closed, but its transcript could not be exported so the channel was kept. Run /tickets close again to retry.", color=Color.red())
                     except Exception as e:
                         embed = discord.Embed(title="Failure", description="Failed to delete the channel", color=Color.red())
                 else:
                     embed = discord.Embed(title="Failure", description="No channel was found. " + str(channel_id), color=Color.red())
             else:
                 embed = discord.Embed(title="Failure", description="This ticket does not exist or cannot be closed.", color=Color.red())
-            await interaction.response.send_message(embed=embed)
+            await interaction.followup.send(embed=embed)
+        except Exception as e:
+            await handle_command_exception(interaction, self.client, "An error occurred while closing the ticket.", e)
+
+    async def _archive_and_delete(self, guild: discord.Guild, channel: discord.TextChannel, ticket_id: int, priority: int = INTERACTIVE) -> bool:
+        if ticket_id in self._archiving:
+            return False
+        self._archiving.add(ticket_id)
+        try:
+            path, message_count = await export_transcript(channel, guild.id, ticket_id)
+            await save_transcript_async(guild.id, ticket_id, path, message_count, os.path.getsize(path))
+        except Exception as e:
+            print(f"Error exporting transcript for ticket {ticket_id}: {e}")
+            return False
+        finally:
+            self._archiving.discard(ticket_id)
+
+        log_channel_id = await get_log_channel_id_async(guild.id)
+        log_channel = guild.get_channel(int(log_channel_id)) if log_channel_id else None
+        if log_channel:
+            embed = discord.Embed(title="Ticket Transcript", description=f"Ticket #{ticket_id} closed with {message_count} messages.", color=Color.from_rgb(100, 150, 255))
+
+            def send_transcript():
+                file = transcript_file(path)
+                if file is None:
+                    embed.set_footer(text=f"Transcript too large to attach, stored at {path}")
+                    return log_channel.send(embed=embed)
+                return log_channel.send(embed=embed, file=file)
+
+            rest_scheduler.schedule(send_transcript, guild_id=guild.id, route="log_send")
+
+        await rest_scheduler.run(channel.delete, guild_id=guild.id, route="channel_delete", priority=priority)
+        return True
+
+    async def _is_admin(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id == interaction.guild.owner_id:
+            return True
+        candidate_ids = [interaction.user.id] + [role.id for role in getattr(interaction.user, "roles", [])]
+        return await is_guild_admin_async(interaction.guild.id, candidate_ids)
+
+    async def _close_in_bulk(self, interaction: discord.Interaction, **filters):
+        server_id = interaction.guild.id
+        closed = await close_tickets_async(server_id, closed_by=interaction.user.id, **filters)
+        if not closed:
+            await interaction.followup.send(embed=discord.Embed(title="No Tickets Closed", description="No open tickets matched the given filters.", color=Color.red()))
+            return
+
+        for ticket_id, _, _ in closed:
+            await record_ticket_event(server_id, ticket_id, interaction.user.id, "closed")
+            await ticket_timers.forget(ticket_id)
+            ticket_router.release(ticket_id)
+
+        embed = discord.Embed(title="Closing Tickets", description=f"{len(closed)} tickets closed. Archiving channels: 0/{len(closed)}", color=Color.orange())
+        message = await interaction.followup.send(embed=embed, wait=True)
+        task = asyncio.create_task(self._delete_ticket_channels(interaction.guild, message, [(ticket_id, channel_id) for ticket_id, _, channel_id in closed]))
+        self._bulk_jobs.add(task)
+        task.add_done_callback(self._bulk_jobs.discard)
+
+    async def _delete_ticket_channels(self, guild: discord.Guild, message: discord.Message, tickets: List[Tuple[int, int]]):
+        total = len(tickets)
+        deleted = failed = 0
+        last_report = time.monotonic()
+        for index, (ticket_id, channel_id) in enumerate(tickets, start=1):
+            channel = guild.get_channel(int(channel_id))
+            if channel is not None:
+                try:
+                    if await self._archive_and_delete(guild, channel, ticket_id, priority=BACKGROUND):
+                        deleted += 1
+                    else:
+                        failed += 1
+                except Exception as e:
+                    print(f"Error deleting ticket channel {channel_id}: {e}")
+                    failed += 1
+                await asyncio.sleep(BULK_DELETE_DELAY)
+
+            if index == total or time.monotonic() - last_report >= BULK_PROGRESS_INTERVAL:
+                last_report = time.monotonic()
+                done = index == total
+                embed = discord.Embed(
+                    title="Tickets Closed" if done else "Closing Tickets",
+                    description=f"{total} tickets closed. Archiving channels: {index}/{total} ({deleted} deleted, {failed} failed)",
+                    color=Color.green() if done else Color.orange()
+                )
+                try:
+                    await rest_scheduler.run(lambda: message.edit(embed=embed), guild_id=guild.id, route="progress_edit", priority=BACKGROUND)
+                except Exception as e:
+                    print(f"Error reporting bulk close progress: {e}")
+
+    async def _assign(self, interaction: discord.Interaction, ticket_id: int, member: Optional[discord.Member], reassign: bool):
+        await interaction.response.defer(thinking=True)
+        server_id = interaction.guild.id
+        if not await self._is_admin(interaction):
+            await interaction.followup.send(embed=create_error_embed("You do not have permission to assign tickets."))
+            return
+
+        ticket = await fetch_ticket_async(server_id, ticket_id)
+        if ticket is None or ticket[2] == "closed":
+            await interaction.followup.send(embed=create_error_embed("Ticket not found or already closed."))
+            return
+
+        _, channel_id, _, priority, current, category = ticket
+        if current is not None and not reassign:
+            await interaction.followup.send(embed=create_error_embed(f"Ticket #{ticket_id} is already assigned to <@{current}>. Use /tickets reassign instead."))
+            return
+        if current is None and reassign:
+            await interaction.followup.send(embed=create_error_embed(f"Ticket #{ticket_id} is not assigned yet. Use /tickets assign instead."))
+            return
+
+        if member is not None:
+            admin_id = member.id
+        else:
+            admin_id = await ticket_router.route(interaction.guild, int(category), exclude=current)
+        if admin_id is None or admin_id == current:
+            await interaction.followup.send(embed=create_error_embed("No other admin is available for this ticket."))
+            return
+
+        assigned, revoked = await assign_ticket_async(server_id, ticket_id, admin_id)
+        if assigned == 0:
+            await interaction.followup.send(embed=create_error_embed("Ticket not found or already closed."))
+            return
+        ticket_router.assign(server_id, ticket_id, admin_id, priority)
+        await record_ticket_event(server_id, ticket_id, interaction.user.id, "reassigned" if reassign else "assigned")
+
+        channel = interaction.guild.get_channel(int(channel_id))
+        admin = interaction.guild.get_member(admin_id)
+        if channel and admin:
+            overwrite = discord.PermissionOverwrite(read_messages=True, send_messages=True, view_channel=True)
+            rest_scheduler.schedule(lambda: channel.set_permissions(admin, overwrite=overwrite), guild_id=server_id, route="channel_permissions")
+            rest_scheduler.schedule(lambda: channel.send(content=f"Ticket #{ticket_id} has been assigned to {admin.mention}."), guild_id=server_id, route="channel_send")
+        if channel and revoked is not None:
+            async def revoke_previous():
+                previous = interaction.guild.get_member(revoked) or await interaction.guild.fetch_member(revoked)
+                await channel.set_permissions(previous, overwrite=None)
+
+            rest_scheduler.schedule(revoke_previous, guild_id=server_id, route="channel_permissions")
+
+        embed = discord.Embed(title="Ticket Assigned", description=f"Ticket #{ticket_id} is now assigned to <@{admin_id}> (load: {ticket_router.load(server_id, admin_id)}).", color=Color.green())
+        await interaction.followup.send(embed=embed)
+
+    @app_commands.command(name="assign", description="Assign a ticket to an admin")
+    @app_commands.describe(ticket_id="Ticket to assign", member="Admin to assign, or leave empty to pick the least-loaded admin")
+    async def assign(self, interaction: discord.Interaction, ticket_id: int, member: Optional[discord.Member] = None):
+        try:
+            await self._assign(interaction, ticket_id, member, reassign=False)
+        except Exception as e:
+            await handle_command_exception(interaction, self.client, "An error occurred while assigning the ticket.", e)
+
+    @app_commands.command(name="reassign", description="Move a ticket to another admin")
+    @app_commands.describe(ticket_id="Ticket to reassign", member="Admin to assign, or leave empty to pick the least-loaded admin")
+    async def reassign(self, interaction: discord.Interaction, ticket_id: int, member: Optional[discord.Member] = None):
+        try:
+            await self._assign(interaction, ticket_id, member, reassign=True)
+        except Exception as e:
+            await handle_command_exception(interaction, self.client, "An error occurred while reassigning the ticket.", e)
+
+    @app_commands.command(name="close-many", description="Close several tickets at once")
+    @app_commands.describe(ticket_ids="Ticket IDs separated by spaces or commas", owner="Close tickets owned by this member", category="Close tickets in this category", status="Close tickets with this status")
+    @app_commands.autocomplete(category=autocomplete_category)
+    async def close_many(self, interaction: discord.Interaction, ticket_ids: Optional[str] = None, owner: Optional[discord.Member] = None, category: Optional[str] = None, status: Optional[Literal["open", "in-progress"]] = None):
+        try:
+            await interaction.response.defer(thinking=True)
+            if not await self._is_admin(interaction):
+                await interaction.followup.send(embed=create_error_embed("You don't have permissions to close tickets in bulk."))
+                return
+
+            ids = [int(part) for part in ticket_ids.replace(",", " ").split() if part.isdigit()] if ticket_ids else None
+            if ticket_ids and not ids:
+                await interaction.followup.send(embed=create_error_embed("No valid ticket IDs were given."))
+                return
+            if category is not None and not category.isdigit():
+                await interaction.followup.send(embed=create_error_embed(f"The category '{category}' does not exist. Please select a valid category."))
+                return
+            if not any([ids, owner, category, status]):
+                await interaction.followup.send(embed=create_error_embed("Please provide at least one filter."))
+                return
+
+            await self._close_in_bulk(
+                interaction,
+                ticket_ids=ids,
+                owner=owner.id if owner else None,
+                category=int(category) if category else None,
+                status=status
+            )
+        except Exception as e:
+            await handle_command_exception(interaction, self.client, "An error occurred while closing tickets.", e)
+
+    @app_commands.command(name="close-stale", description="Close tickets with no activity for a number of days")
+    @app_commands.describe(older_than="Close tickets not updated for this many days")
+    async def close_stale(self, interaction: discord.Interaction, older_than: app_commands.Range[int, 1, 365]):
+        try:
+            await interaction.response.defer(thinking=True)
+            if not await self._is_admin(interaction):
+                await interaction.followup.send(embed=create_error_embed("You don't have permissions to close tickets in bulk."))
+                return
+
+            await self._close_in_bulk(interaction, older_than_days=older_than)
         except Exception as e:
-            await handle_command_exception(interaction, self.client, None, "An error occurred while closing the ticket.", e)
+            await handle_command_exception(interaction, self.client, "An error occurred while closing stale tickets.", e)
 
 async def setup(client):
     if Tickets(client).status:
@@ -0,0 +1,68 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+CONFIG_CACHE_SIZE = 1024
+MISS = object()
+
+@dataclass(frozen=True)
+class GuildConfig:
+    server_id: int
+    admin_role_ids: Tuple[int, ...]
+    log_channel_id: Optional[int]
+    ticket_categories: Tuple[int, ...]
+    max_tickets_per_user: Optional[int]
+    channel_pool_size: int = 0
+
+    def as_tuple(self):
+        return (list(self.admin_role_ids), self.log_channel_id, list(self.ticket_categories), self.max_tickets_per_user)
+
+class ConfigCache:
+    def __init__(self, maxsize: int = CONFIG_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, server_id: int):
+        with self._lock:
+            if server_id in self._entries:
+                self._entries.move_to_end(server_id)
+                self.hits += 1
+                return self._entries[server_id]
+            self.misses += 1
+            return MISS
+
+    def put(self, server_id: int, config: Optional[GuildConfig], generation: Optional[int] = None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[server_id] = config
+            self._entries.move_to_end(server_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, server_id: int):
+        with self._lock:
+            self.generation += 1
+            self._entries.pop(server_id, None)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+config_cache = ConfigCache()
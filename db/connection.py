@@ -0,0 +1,79 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DB_PATH = 'db/mydatabase.db'
+READER_COUNT = 4
+CACHE_SIZE_KIB = 16000
+CACHED_STATEMENTS = 256
+
+class ConnectionPool:
+    def __init__(self, path: str = DB_PATH, readers: int = READER_COUNT):
+        self.path = path
+        self.reader_count = readers
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._readers = queue.LifoQueue()
+        self._opened_readers = 0
+        self._readers_lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False, cached_statements=CACHED_STATEMENTS)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute(f'PRAGMA cache_size=-{CACHE_SIZE_KIB}')
+        connection.execute('PRAGMA temp_store=MEMORY')
+        connection.execute('PRAGMA busy_timeout=5000')
+        return connection
+
+    def _acquire_reader(self) -> sqlite3.Connection:
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._readers_lock:
+            if self._opened_readers < self.reader_count:
+                self._opened_readers += 1
+                return self._connect()
+        return self._readers.get()
+
+    @contextmanager
+    def reader(self):
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+        connection = self._acquire_reader()
+        try:
+            yield connection
+        finally:
+            self._readers.put(connection)
+
+    @contextmanager
+    def writer(self):
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = self._connect()
+            try:
+                yield self._writer
+                self._writer.commit()
+            except BaseException:
+                self._writer.rollback()
+                raise
+
+    def close(self):
+        self._closed = True
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+        self._opened_readers = 0
+
+pool = ConnectionPool()
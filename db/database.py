@@ -1,18 +1,54 @@
-import json
+import asyncio
+import functools
 import sqlite3
 import datetime
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
-import sqlite3
-from typing import List, Optional, Tuple
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple, Union
+
+from db.connection import pool, READER_COUNT
+from db.config_cache import GuildConfig, config_cache, MISS
+from db.migrations import run_migrations
+from db.stats import StatsDelta
+
+_db_executor = ThreadPoolExecutor(max_workers=READER_COUNT + 1, thread_name_prefix="sqlite")
+_open_ticket_counts = {}
+_open_ticket_counts_lock = threading.Lock()
+
+class TicketLimitReached(Exception):
+    pass
+
+def _load_guild_config(server_id: int) -> Optional[GuildConfig]:
+    generation = config_cache.generation
+    with pool.reader() as connection:
+        result = connection.execute('''SELECT log_channel_id, max_tickets_per_user, channel_pool_size FROM config WHERE server_id = ?''', (server_id,)).fetchone()
+        if result:
+            admin_ids = connection.execute('''SELECT user_id FROM guild_admins WHERE server_id = ?''', (server_id,)).fetchall()
+            category_ids = connection.execute('''SELECT category_id FROM guild_ticket_categories WHERE server_id = ?''', (server_id,)).fetchall()
+    config = GuildConfig(
+        server_id=server_id,
+        admin_role_ids=tuple(row[0] for row in admin_ids),
+        log_channel_id=result[0],
+        ticket_categories=tuple(row[0] for row in category_ids),
+        max_tickets_per_user=result[1],
+        channel_pool_size=result[2]
+    ) if result else None
+    config_cache.put(server_id, config, generation)
+    return config
+
+def fetch_guild_config(server_id: int) -> Optional[GuildConfig]:
+    cached = config_cache.get(server_id)
+    if cached is not MISS:
+        return cached
+    return _load_guild_config(server_id)
 
 def get_log_channel_id(server_id):
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        cursor.execute('''SELECT log_channel_id FROM config WHERE server_id = ?''', (server_id,))
-        result = cursor.fetchone()
-        connection.close()
-        return result[0] if result else None
+        config = fetch_guild_config(server_id)
+        return config.log_channel_id if config else None
     except Exception as e:
         print(f"Error fetching log channel ID: {e}")
         return None
@@ -20,257 +56,711 @@ def get_log_channel_id(server_id):
     # -> Optional[Tuple[List[int], Optional[int], List[str]]]
 def fetch_config(server_id: int):
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        cursor.execute('''SELECT admin_role_ids, log_channel_id, COALESCE(tickets_categories, '[]'), max_tickets_per_user FROM config WHERE server_id = ?''', (server_id,))
-        result = cursor.fetchone()
-        connection.close()
-        
-        # print(f"Fetched result: {result}") 
-
-        if result:
-            admin_role_ids = json.loads(result[0]) if result[0] else []
-            log_channel_id = result[1]
-            categories_names = json.loads(result[2]) if result[2] else []
-            max_tickets_per_user = result[3]
-            return (admin_role_ids, log_channel_id, categories_names, max_tickets_per_user)
-        return None
+        config = fetch_guild_config(server_id)
+        return config.as_tuple() if config else None
     except Exception as e:
         print(f"Error fetching config: {e}")
         return None
     
-def connect_db():
+class UnitOfWork:
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+        self.cursor = connection.cursor()
+
+    def execute(self, query, params=()) -> int:
+        return self.cursor.execute(query, params).rowcount
+
+    def executemany(self, query, seq_of_params) -> int:
+        return self.cursor.executemany(query, seq_of_params).rowcount
+
+    def fetchone(self, query, params=()):
+        return self.cursor.execute(query, params).fetchone()
+
+    def fetchall(self, query, params=()):
+        return self.cursor.execute(query, params).fetchall()
+
+@contextmanager
+def transaction():
+    with pool.writer() as connection:
+        connection.execute('BEGIN IMMEDIATE')
+        yield UnitOfWork(connection)
+
+def run_statements(statements: List[Tuple[str, Union[tuple, list]]]) -> List[int]:
+    with transaction() as unit:
+        return [
+            unit.executemany(query, params) if isinstance(params, list) else unit.execute(query, params)
+            for query, params in statements
+        ]
+
+def execute_transaction(statements: List[Tuple[str, Union[tuple, list]]]) -> Optional[List[int]]:
     try:
-        connection = sqlite3.connect('db/mydatabase.db')
-        cursor = connection.cursor()
-        return connection, cursor
+        return run_statements(statements)
     except Exception as e:
-        print(f"Error connecting to database: {e}")
+        print(f"Error executing transaction: {e}")
         return None
-    
-def close_db(connection):
+
+def create_ticket(server_id: int, ticket_id: int, channel_id: int, title: str, description: str, category: int, created_at: str, owner: int, admin_ids: List[int], assigned_to: Optional[int] = None, max_open: Optional[int] = None) -> bool:
     try:
-        connection.close()
+        with transaction() as unit:
+            if max_open is not None:
+                row = unit.fetchone('''SELECT open_count FROM open_ticket_counts WHERE server_id = ? AND owner = ?''', (server_id, owner))
+                open_count = row[0] if row else 0
+                if open_count >= max_open:
+                    raise TicketLimitReached(f"user {owner} already has {open_count} open tickets")
+            unit.execute('''INSERT INTO tickets (server_id, channel_id, ticket_id, title, description, category, created_at, owner, assigned_to) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                        (server_id, channel_id, ticket_id, title, description, category, created_at, owner, assigned_to))
+            unit.executemany('''INSERT INTO ticket_permissions (ticket_id, user_id, role) VALUES (?, ?, ?)''',
+                        [(ticket_id, owner, 'user')] + [(ticket_id, admin_id, 'admin') for admin_id in admin_ids])
+            unit.execute('''INSERT INTO owner_ticket_counts (server_id, owner, total) VALUES (?, ?, 1) ON CONFLICT (server_id, owner) DO UPDATE SET total = total + 1''',
+                        (server_id, owner))
+            unit.execute('''INSERT INTO open_ticket_counts (server_id, owner, open_count) VALUES (?, ?, 1) ON CONFLICT (server_id, owner) DO UPDATE SET open_count = open_count + 1''',
+                        (server_id, owner))
+            delta = StatsDelta()
+            delta.created(server_id, category, created_at)
+            delta.apply(unit)
+        _adjust_open_ticket_count(server_id, owner, 1)
+        return True
+    except TicketLimitReached:
+        raise
     except Exception as e:
-        print(f"Error closing database connection: {e}")
+        print(f"Error creating ticket: {e}")
+        return False
+
+def close_ticket(server_id: int, ticket_id: int, owner: int, closed_by: Optional[int] = None) -> int:
+    try:
+        with transaction() as unit:
+            rowcount = unit.execute("""UPDATE tickets SET status = 'closed', updated_at = CURRENT_TIMESTAMP WHERE server_id = ? AND ticket_id = ? AND owner = ? AND status != 'closed'""",
+                        (server_id, ticket_id, owner))
+            if rowcount > 0:
+                unit.execute('''UPDATE open_ticket_counts SET open_count = MAX(open_count - 1, 0) WHERE server_id = ? AND owner = ?''',
+                            (server_id, owner))
+                category, created_at, channel_id = unit.fetchone('''SELECT category, created_at, channel_id FROM tickets WHERE ticket_id = ?''', (ticket_id,))
+                unit.execute('''INSERT OR REPLACE INTO ticket_archive_queue (ticket_id, server_id, channel_id) VALUES (?, ?, ?)''',
+                            (ticket_id, server_id, channel_id))
+                delta = StatsDelta()
+                delta.closed(server_id, category, created_at, closed_by=closed_by, owner=owner)
+                delta.apply(unit)
+        if rowcount > 0:
+            _adjust_open_ticket_count(server_id, owner, -1)
+        return rowcount
+    except Exception as e:
+        print(f"Error closing ticket: {e}")
+        return 0
+
+def close_tickets(server_id: int, ticket_ids: Optional[List[int]] = None, owner: Optional[int] = None, category: Optional[int] = None, status: Optional[str] = None, older_than_days: Optional[int] = None, closed_by: Optional[int] = None) -> List[Tuple[int, int, int]]:
+    conditions = ["server_id = ?", "status != 'closed'"]
+    params = [server_id]
+    if ticket_ids:
+        conditions.append(f"ticket_id IN ({', '.join('?' for _ in ticket_ids)})")
+        params.extend(ticket_ids)
+    if owner is not None:
+        conditions.append("owner = ?")
+        params.append(owner)
+    if category is not None:
+        conditions.append("category = ?")
+        params.append(category)
+    if status is not None:
+        conditions.append("status = ?")
+        params.append(status)
+    if older_than_days is not None:
+        conditions.append("datetime(updated_at) < datetime('now', ?)")
+        params.append(f"-{older_than_days} days")
+    where = " AND ".join(conditions)
+
+    try:
+        with transaction() as unit:
+            rows = unit.fetchall(f'''SELECT ticket_id, owner, channel_id, category, created_at FROM tickets WHERE {where}''', params)
+            if not rows:
+                return []
+            unit.execute(f'''UPDATE tickets SET status = 'closed', updated_at = CURRENT_TIMESTAMP WHERE {where}''', params)
+            closed = [row[:3] for row in rows]
+            unit.executemany('''INSERT OR REPLACE INTO ticket_archive_queue (ticket_id, server_id, channel_id) VALUES (?, ?, ?)''',
+                        [(ticket_id, server_id, channel_id) for ticket_id, _, channel_id in closed])
+            per_owner = Counter(owner for _, owner, _ in closed)
+            unit.executemany('''UPDATE open_ticket_counts SET open_count = MAX(open_count - ?, 0) WHERE server_id = ? AND owner = ?''',
+                        [(count, server_id, owner) for owner, count in per_owner.items()])
+            delta = StatsDelta()
+            for _, ticket_owner, _, ticket_category, created_at in rows:
+                delta.closed(server_id, ticket_category, created_at, closed_by=closed_by, owner=ticket_owner)
+            delta.apply(unit)
+        for owner, count in per_owner.items():
+            _adjust_open_ticket_count(server_id, owner, -count)
+        return closed
+    except Exception as e:
+        print(f"Error closing tickets: {e}")
+        return []
+
+def _adjust_open_ticket_count(server_id: int, owner: int, delta: int):
+    with _open_ticket_counts_lock:
+        key = (server_id, owner)
+        _open_ticket_counts[key] = max(_open_ticket_counts.get(key, 0) + delta, 0)
+
+def get_open_ticket_count(server_id: int, owner: int) -> int:
+    return _open_ticket_counts.get((server_id, owner), 0)
+
+def reconcile_open_ticket_counts() -> int:
+    with transaction() as unit:
+        unit.execute('''DELETE FROM open_ticket_counts''')
+        unit.execute('''INSERT INTO open_ticket_counts (server_id, owner, open_count)
+                        SELECT server_id, owner, COUNT(*) FROM tickets WHERE status != 'closed' AND owner IS NOT NULL GROUP BY server_id, owner''')
+        rows = unit.fetchall('''SELECT server_id, owner, open_count FROM open_ticket_counts''')
+    with _open_ticket_counts_lock:
+        _open_ticket_counts.clear()
+        _open_ticket_counts.update({(server_id, owner): open_count for server_id, owner, open_count in rows})
+    return len(rows)
+
+def fetch_ticket(server_id: int, ticket_id: int) -> Optional[Tuple[int, int, str, str, Optional[int], str]]:
+    try:
+        with pool.reader() as connection:
+            return connection.execute('''SELECT owner, channel_id, status, priority, assigned_to, category FROM tickets WHERE server_id = ? AND ticket_id = ?''',
+                        (server_id, ticket_id)).fetchone()
+    except Exception as e:
+        print(f"Error fetching ticket: {e}")
         return None
-    
+
+def escalate_ticket_priority(server_id: int, ticket_id: int) -> Optional[str]:
+    try:
+        with transaction() as unit:
+            unit.execute("""UPDATE tickets SET priority = CASE priority WHEN 'low' THEN 'medium' ELSE 'high' END, updated_at = CURRENT_TIMESTAMP WHERE server_id = ? AND ticket_id = ? AND status != 'closed'""",
+                        (server_id, ticket_id))
+            result = unit.fetchone('''SELECT priority FROM tickets WHERE server_id = ? AND ticket_id = ?''', (server_id, ticket_id))
+        return result[0] if result else None
+    except Exception as e:
+        print(f"Error escalating ticket priority: {e}")
+        return None
+
+def assign_ticket(server_id: int, ticket_id: int, admin_id: int) -> Tuple[int, Optional[int]]:
+    try:
+        with transaction() as unit:
+            row = unit.fetchone("""SELECT assigned_to, owner FROM tickets WHERE server_id = ? AND ticket_id = ? AND status != 'closed'""", (server_id, ticket_id))
+            if row is None:
+                return 0, None
+            previous, owner = row
+            unit.execute('''UPDATE tickets SET assigned_to = ?, updated_at = CURRENT_TIMESTAMP WHERE ticket_id = ?''', (admin_id, ticket_id))
+            unit.execute('''INSERT INTO ticket_permissions (ticket_id, user_id, role) SELECT ?, ?, 'admin'
+                            WHERE NOT EXISTS (SELECT 1 FROM ticket_permissions WHERE ticket_id = ? AND user_id = ? AND role = 'admin')''',
+                        (ticket_id, admin_id, ticket_id, admin_id))
+            revoked = None
+            if previous is not None and previous not in (admin_id, owner) and unit.fetchone('''SELECT 1 FROM guild_admins WHERE server_id = ? AND user_id = ?''', (server_id, previous)) is None:
+                unit.execute("""DELETE FROM ticket_permissions WHERE ticket_id = ? AND user_id = ? AND role = 'admin'""", (ticket_id, previous))
+                revoked = previous
+        return 1, revoked
+    except Exception as e:
+        print(f"Error assigning ticket: {e}")
+        return 0, None
+
+def fetch_assigned_tickets():
+    try:
+        with pool.reader() as connection:
+            return connection.execute("""SELECT server_id, ticket_id, assigned_to, priority FROM tickets WHERE status != 'closed' AND assigned_to IS NOT NULL""").fetchall()
+    except Exception as e:
+        print(f"Error fetching assigned tickets: {e}")
+        return []
+
+def fetch_category_admins(server_id: int) -> Dict[int, List[int]]:
+    try:
+        with pool.reader() as connection:
+            rows = connection.execute('''SELECT category_id, admin_id FROM category_admins WHERE server_id = ?''', (server_id,)).fetchall()
+        pools = {}
+        for category_id, admin_id in rows:
+            pools.setdefault(category_id, []).append(admin_id)
+        return pools
+    except Exception as e:
+        print(f"Error fetching category admins: {e}")
+        return {}
+
+def add_category_admin(server_id: int, category_id: int, admin_id: int) -> bool:
+    try:
+        with pool.writer() as connection:
+            rowcount = connection.execute('''INSERT OR IGNORE INTO category_admins (server_id, category_id, admin_id) VALUES (?, ?, ?)''',
+                        (server_id, category_id, admin_id)).rowcount
+        return rowcount > 0
+    except Exception as e:
+        print(f"Error adding category admin: {e}")
+        return False
+
+def remove_category_admin(server_id: int, category_id: int, admin_id: int) -> bool:
+    try:
+        with pool.writer() as connection:
+            rowcount = connection.execute('''DELETE FROM category_admins WHERE server_id = ? AND category_id = ? AND admin_id = ?''',
+                        (server_id, category_id, admin_id)).rowcount
+        return rowcount > 0
+    except Exception as e:
+        print(f"Error removing category admin: {e}")
+        return False
+
+def fetch_ticket_timers():
+    try:
+        with pool.reader() as connection:
+            timers = connection.execute('''SELECT ticket_id, action, server_id, channel_id, due_at FROM ticket_timers''').fetchall()
+            open_tickets = connection.execute("""SELECT server_id, ticket_id, channel_id FROM tickets WHERE status != 'closed'""").fetchall()
+        return timers, open_tickets
+    except Exception as e:
+        print(f"Error fetching ticket timers: {e}")
+        return [], []
+
+def save_transcript(server_id: int, ticket_id: int, path: str, message_count: int, size_bytes: int) -> bool:
+    try:
+        with pool.writer() as connection:
+            connection.execute('''INSERT OR REPLACE INTO ticket_transcripts (ticket_id, server_id, path, message_count, size_bytes) VALUES (?, ?, ?, ?, ?)''',
+                        (ticket_id, server_id, path, message_count, size_bytes))
+            connection.execute('''DELETE FROM ticket_archive_queue WHERE ticket_id = ?''', (ticket_id,))
+        return True
+    except Exception as e:
+        print(f"Error saving transcript: {e}")
+        return False
+
+def fetch_transcript(server_id: int, ticket_id: int):
+    try:
+        with pool.reader() as connection:
+            return connection.execute('''SELECT path, message_count, size_bytes, created_at FROM ticket_transcripts WHERE server_id = ? AND ticket_id = ?''',
+                        (server_id, ticket_id)).fetchone()
+    except Exception as e:
+        print(f"Error fetching transcript: {e}")
+        return None
+
+def fetch_pending_archives(limit: int, shard_count: Optional[int] = None, shard_ids: Optional[List[int]] = None) -> List[Tuple[int, int, int]]:
+    query = '''SELECT ticket_id, server_id, channel_id FROM ticket_archive_queue WHERE datetime(queued_at) < datetime('now', '-10 minutes')'''
+    params = []
+    if shard_count and shard_ids is not None:
+        query += f" AND ((server_id >> 22) % ?) IN ({', '.join('?' for _ in shard_ids)})"
+        params = [shard_count] + list(shard_ids)
+    try:
+        with pool.reader() as connection:
+            return connection.execute(query + " ORDER BY attempts, queued_at LIMIT ?", params + [limit]).fetchall()
+    except Exception as e:
+        print(f"Error fetching pending archives: {e}")
+        return []
+
+def finish_pending_archive(ticket_id: int, archived: bool):
+    try:
+        with pool.writer() as connection:
+            if archived:
+                connection.execute('''DELETE FROM ticket_archive_queue WHERE ticket_id = ?''', (ticket_id,))
+            else:
+                connection.execute('''UPDATE ticket_archive_queue SET attempts = attempts + 1 WHERE ticket_id = ?''', (ticket_id,))
+    except Exception as e:
+        print(f"Error updating pending archive: {e}")
+
+def fetch_ticket_messages(ticket_id: int, limit: int, after: Optional[Tuple[str, int]] = None, before: Optional[Tuple[str, int]] = None):
+    try:
+        with pool.reader() as connection:
+            if before is not None:
+                rows = connection.execute('''SELECT id, author_id, created_at, content, attachments FROM ticket_messages WHERE ticket_id = ? AND (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC LIMIT ?''',
+                            (ticket_id, before[0], before[1], limit)).fetchall()
+                return rows[::-1]
+            if after is not None:
+                return connection.execute('''SELECT id, author_id, created_at, content, attachments FROM ticket_messages WHERE ticket_id = ? AND (created_at, id) > (?, ?) ORDER BY created_at, id LIMIT ?''',
+                            (ticket_id, after[0], after[1], limit)).fetchall()
+            return connection.execute('''SELECT id, author_id, created_at, content, attachments FROM ticket_messages WHERE ticket_id = ? ORDER BY created_at, id LIMIT ?''',
+                        (ticket_id, limit)).fetchall()
+    except Exception as e:
+        print(f"Error fetching ticket messages: {e}")
+        return None
+
+def fetch_ticket_page(server_id: int, owner: int, limit: int, after: Optional[int] = None, before: Optional[int] = None, offset: int = 0):
+    try:
+        with pool.reader() as connection:
+            if before is not None:
+                rows = connection.execute('''SELECT ticket_id, title, description, created_at, status FROM tickets WHERE server_id = ? AND owner = ? AND ticket_id < ? ORDER BY ticket_id DESC LIMIT ?''',
+                            (server_id, owner, before, limit)).fetchall()
+                return rows[::-1]
+            if after is not None:
+                return connection.execute('''SELECT ticket_id, title, description, created_at, status FROM tickets WHERE server_id = ? AND owner = ? AND ticket_id > ? ORDER BY ticket_id LIMIT ?''',
+                            (server_id, owner, after, limit)).fetchall()
+            return connection.execute('''SELECT ticket_id, title, description, created_at, status FROM tickets WHERE server_id = ? AND owner = ? ORDER BY ticket_id LIMIT ? OFFSET ?''',
+                        (server_id, owner, limit, offset)).fetchall()
+    except Exception as e:
+        print(f"Error fetching ticket page: {e}")
+        return None
+
+def _fts_query(server_id: int, query: str, columns: str) -> Optional[str]:
+    terms = " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+    if not terms:
+        return None
+    return f'server_id : "{server_id}" AND {{{columns}}} : ({terms})'
+
+def search_tickets(server_id: int, query: str, limit: int, offset: int = 0):
+    ticket_match = _fts_query(server_id, query, "title description")
+    if ticket_match is None:
+        return []
+    try:
+        with pool.reader() as connection:
+            return connection.execute('''
+                SELECT t.ticket_id, t.title, t.description, t.created_at, t.status
+                FROM (
+                    SELECT id, MIN(score) AS score FROM (
+                        SELECT rowid AS id, bm25(tickets_fts) AS score FROM tickets_fts WHERE tickets_fts MATCH ?
+                        UNION ALL
+                        SELECT tickets.id, bm25(ticket_messages_fts) FROM ticket_messages_fts
+                        JOIN ticket_messages ON ticket_messages.id = ticket_messages_fts.rowid
+                        JOIN tickets ON tickets.ticket_id = ticket_messages.ticket_id
+                        WHERE ticket_messages_fts MATCH ?
+                    ) GROUP BY id
+                ) AS hits
+                JOIN tickets t ON t.id = hits.id
+                ORDER BY hits.score, t.ticket_id DESC
+                LIMIT ? OFFSET ?
+            ''', (ticket_match, _fts_query(server_id, query, "content"), limit, offset)).fetchall()
+    except Exception as e:
+        print(f"Error searching tickets: {e}")
+        return None
+
+def fetch_owner_ticket_count(server_id: int, owner: int) -> int:
+    try:
+        with pool.reader() as connection:
+            result = connection.execute('''SELECT total FROM owner_ticket_counts WHERE server_id = ? AND owner = ?''', (server_id, owner)).fetchone()
+        return result[0] if result else 0
+    except Exception as e:
+        print(f"Error fetching ticket count: {e}")
+        return 0
+
+def fetch_ticket_stats(server_id: int, days: int) -> Optional[dict]:
+    try:
+        since = (datetime.datetime.utcnow() - datetime.timedelta(days=days - 1)).strftime("%Y-%m-%d")
+        since_hour = (datetime.datetime.utcnow() - datetime.timedelta(hours=23)).strftime("%Y-%m-%dT%H")
+        with pool.reader() as connection:
+            open_by_category = connection.execute('''SELECT category, open_count FROM ticket_open_by_category WHERE server_id = ? AND open_count > 0 ORDER BY open_count DESC''',
+                        (server_id,)).fetchall()
+            hourly = connection.execute('''SELECT hour, SUM(created), SUM(closed) FROM ticket_stats_hourly WHERE server_id = ? AND hour >= ? GROUP BY hour ORDER BY hour''',
+                        (server_id, since_hour)).fetchall()
+            created, closed, close_seconds = connection.execute('''SELECT COALESCE(SUM(created), 0), COALESCE(SUM(closed), 0), COALESCE(SUM(close_seconds), 0) FROM ticket_stats_daily WHERE server_id = ? AND day >= ?''',
+                        (server_id, since)).fetchone()
+            close_buckets = connection.execute('''SELECT bucket, SUM(closed) FROM ticket_close_times WHERE server_id = ? AND day >= ? GROUP BY bucket''',
+                        (server_id, since)).fetchall()
+            admin_load = connection.execute('''SELECT admin_id, SUM(closed) AS total FROM ticket_admin_load WHERE server_id = ? AND day >= ? GROUP BY admin_id ORDER BY total DESC LIMIT 10''',
+                        (server_id, since)).fetchall()
+        return {
+            "open_by_category": open_by_category,
+            "hourly": hourly,
+            "created": created,
+            "closed": closed,
+            "close_seconds": close_seconds,
+            "close_buckets": dict(close_buckets),
+            "admin_load": admin_load
+        }
+    except Exception as e:
+        print(f"Error fetching ticket stats: {e}")
+        return None
+
 def execute_select(query, params=()):
     try:
-        connection, cursor = connect_db()
-        cursor.execute(query, params)
-        result = cursor.fetchall()
-        close_db(connection)
-        return result
+        with pool.reader() as connection:
+            return connection.execute(query, params).fetchall()
     except Exception as e:
         print(f"Error executing select query: {e}")
         return None
     
 def execute_query(query, params=()):
     try:
-        connection, cursor = connect_db()
-        cursor.execute(query, params)
-        connection.commit()
-        rowcount = cursor.rowcount
-        close_db(connection)
-        return rowcount
+        with pool.writer() as connection:
+            return connection.execute(query, params).rowcount
     except Exception as e:
         print(f"Error executing query: {e}")
         return None
     
 def generate_ticket_id():
     try:
-        connection, cursor = connect_db()
-        cursor.execute('SELECT MAX(ticket_id) FROM tickets')
-        max_id = cursor.fetchone()[0]
-        close_db(connection)
-        return (max_id or 0) + 1
+        with pool.writer() as connection:
+            connection.execute("UPDATE ticket_sequence SET value = value + 1 WHERE name = 'tickets'")
+            return connection.execute("SELECT value FROM ticket_sequence WHERE name = 'tickets'").fetchone()[0]
     except Exception as e:
         print(f"Error generating ticket ID: {e}")
         return None
 
-def get_db_connection() -> sqlite3.Connection:
-    try:
-        connection = sqlite3.connect('db/mydatabase.db')
-        return connection
-    except Exception as e:
-        print(f"Error connecting to database: {e}")
-        return None
-
 def fetch_admin_role_ids(server_id: int) -> Optional[List[int]]:
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        cursor.execute('''SELECT admin_role_ids FROM config WHERE server_id = ?''', (server_id,))
-        result = cursor.fetchone()
-        connection.close()
-        return eval(result[0]) if result and result[0] else []
+        config = fetch_guild_config(server_id)
+        return list(config.admin_role_ids) if config else []
     except Exception as e:
         print(f"Error fetching admin role IDs: {e}")
         return None
     
+def _replace_guild_admins(cursor, server_id: int, admin_role_ids: List[int]):
+    cursor.execute('''DELETE FROM guild_admins WHERE server_id = ?''', (server_id,))
+    cursor.executemany('''INSERT OR IGNORE INTO guild_admins (server_id, user_id) VALUES (?, ?)''',
+                    [(server_id, user_id) for user_id in admin_role_ids])
+
 def insert_config(server_id: int, admin_role_ids: list, log_channel_id: Optional[int]):
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        cursor.execute('''INSERT INTO config (server_id, admin_role_ids, log_channel_id) VALUES (?, ?, ?)''',
-                    (server_id, str(admin_role_ids), log_channel_id))
-        connection.commit()
-        connection.close()
+        with pool.writer() as connection:
+            cursor = connection.cursor()
+            cursor.execute('''INSERT INTO config (server_id, log_channel_id) VALUES (?, ?)''',
+                        (server_id, log_channel_id))
+            _replace_guild_admins(cursor, server_id, admin_role_ids)
+        config_cache.invalidate(server_id)
     except Exception as e:
         print(f"Error inserting config: {e}")
         
-def update_config(server_id: int, admin_role_ids: List[int] = None, log_channel_id: Optional[int] = None, ticket_categories: Optional[List[str]] = None, max_tickets_per_user: Optional[int] = None):
+def update_config(server_id: int, admin_role_ids: List[int] = None, log_channel_id: Optional[int] = None, ticket_categories: Optional[List[int]] = None, max_tickets_per_user: Optional[int] = None, channel_pool_size: Optional[int] = None):
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        
-        if log_channel_id is not None:
-            cursor.execute('''UPDATE config SET log_channel_id = ? WHERE server_id = ?''',
-                        (log_channel_id, server_id))
-        
-        admin_role_ids_json = json.dumps(admin_role_ids)
-        cursor.execute('''UPDATE config SET admin_role_ids = ? WHERE server_id = ?''',
-                    (admin_role_ids_json, server_id))
-
-        if ticket_categories is not None:
-            ticket_categories_json = json.dumps(ticket_categories)
-            cursor.execute('''UPDATE config SET tickets_categories = ? WHERE server_id = ?''',
-                        (ticket_categories_json, server_id))
-
-        if max_tickets_per_user is not None:
-            cursor.execute('''UPDATE config SET max_tickets_per_user = ? WHERE server_id = ?''',
-                        (max_tickets_per_user, server_id))
+        with transaction() as unit:
+            unit.execute('''UPDATE config SET log_channel_id = COALESCE(?, log_channel_id), max_tickets_per_user = COALESCE(?, max_tickets_per_user), channel_pool_size = COALESCE(?, channel_pool_size), updated_at = CURRENT_TIMESTAMP WHERE server_id = ?''',
+                        (log_channel_id, max_tickets_per_user, channel_pool_size, server_id))
             
-        connection.commit()
-        connection.close()
+            if admin_role_ids is not None:
+                _replace_guild_admins(unit.cursor, server_id, admin_role_ids)
+
+            if ticket_categories is not None:
+                unit.execute('''DELETE FROM guild_ticket_categories WHERE server_id = ?''', (server_id,))
+                unit.executemany('''INSERT OR IGNORE INTO guild_ticket_categories (server_id, category_id) VALUES (?, ?)''',
+                            [(server_id, category_id) for category_id in ticket_categories])
+        config_cache.invalidate(server_id)
     except Exception as e:
         print(f"Error updating config: {e}")
         
-def add_admin_role(server_id: int, admin_user_id: int):
+def add_admin_role(server_id: int, admin_user_id: int) -> bool:
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        admin_roles = fetch_admin_role_ids(server_id)
-        if admin_user_id not in admin_roles:
-            admin_roles.append(admin_user_id)
-            update_config(server_id, admin_roles, None, None)
-        connection.close()
+        with pool.writer() as connection:
+            rowcount = connection.execute('''INSERT OR IGNORE INTO guild_admins (server_id, user_id) VALUES (?, ?)''',
+                        (server_id, admin_user_id)).rowcount
+        config_cache.invalidate(server_id)
+        return rowcount > 0
     except Exception as e:
         print(f"Error adding admin role: {e}")
+        return False
         
-def delete_admin_role(server_id: int, admin_user_id: int):
+def delete_admin_role(server_id: int, admin_user_id: int) -> bool:
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        admin_roles = fetch_admin_role_ids(server_id)
-        if admin_user_id in admin_roles:
-            admin_roles.remove(admin_user_id)
-            update_config(server_id, admin_roles, None, None)
-        connection.close()
+        with pool.writer() as connection:
+            rowcount = connection.execute('''DELETE FROM guild_admins WHERE server_id = ? AND user_id = ?''',
+                        (server_id, admin_user_id)).rowcount
+        config_cache.invalidate(server_id)
+        return rowcount > 0
     except Exception as e:
         print(f"Error deleting admin role: {e}")
+        return False
+
+def is_guild_admin(server_id: int, user_ids: List[int]) -> bool:
+    try:
+        placeholders = ", ".join("?" for _ in user_ids)
+        with pool.reader() as connection:
+            result = connection.execute(f'''SELECT 1 FROM guild_admins WHERE server_id = ? AND user_id IN ({placeholders}) LIMIT 1''',
+                        (server_id, *user_ids)).fetchone()
+        return result is not None
+    except Exception as e:
+        print(f"Error checking admin role: {e}")
+        return False
+
+def is_ticket_category(server_id: int, category_id: int) -> bool:
+    try:
+        with pool.reader() as connection:
+            result = connection.execute('''SELECT 1 FROM guild_ticket_categories WHERE server_id = ? AND category_id = ?''',
+                        (server_id, category_id)).fetchone()
+        return result is not None
+    except Exception as e:
+        print(f"Error checking ticket category: {e}")
+        return False
         
 def fetch_ticket_categories(server_id: int) -> Optional[List[str]]:
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        cursor.execute('''SELECT tickets_categories FROM config WHERE server_id = ?''', (server_id,))
-        result = cursor.fetchone()
-        connection.close()
-        return eval(result[0]) if result and result[0] else []
+        config = fetch_guild_config(server_id)
+        return list(config.ticket_categories) if config else []
     except Exception as e:
         print(f"Error fetching ticket categories: {e}")
         return None
 
-def add_ticket_category(server_id: int, category_name: str):
+def add_ticket_category(server_id: int, category_id: int) -> bool:
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        categories = fetch_ticket_categories(server_id)
-        admin_roles = fetch_admin_role_ids(server_id)
-        if category_name not in categories:
-            categories.append(category_name)
-            update_config(server_id, admin_roles, None, categories)
-        connection.close()
+        with pool.writer() as connection:
+            rowcount = connection.execute('''INSERT OR IGNORE INTO guild_ticket_categories (server_id, category_id) VALUES (?, ?)''',
+                        (server_id, category_id)).rowcount
+        config_cache.invalidate(server_id)
+        return rowcount > 0
     except Exception as e:
         print(f"Error adding ticket category: {e}")
-        
-def create_tables(cursor):
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS config (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            server_id INTEGER NOT NULL UNIQUE,
-            prefix TEXT DEFAULT '!',
-            admin_role_ids JSON,
-            log_channel_id INTEGER,
-            max_tickets_per_user INTEGER,
-            tickets_categories JSON,
-            other_settings JSON,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-        );
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS tickets (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            server_id INTEGER NOT NULL,
-            ticket_id INTEGER NOT NULL UNIQUE,
-            title TEXT,
-            description TEXT,
-            category TEXT,
-            channel_id INTEGER NOT NULL,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            status TEXT CHECK(status IN ('open', 'closed', 'in-progress')) DEFAULT 'open',
-            priority TEXT CHECK(priority IN ('low', 'medium', 'high')) DEFAULT 'medium',
-            assigned_to INTEGER,
-            owner INTEGER,
-            comments JSON
-        );
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS ticket_permissions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ticket_id INTEGER NOT NULL,
-            user_id INTEGER NOT NULL,
-            role TEXT CHECK(role IN ('admin', 'user')) DEFAULT 'user',
-            FOREIGN KEY (ticket_id) REFERENCES tickets(id)
-        );
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS reacts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            server_id INTEGER NOT NULL,
-            react_id INTEGER NOT NULL UNIQUE,
-            channel_id INTEGER,
-            message_id INTEGER,
-            react_emoji TEXT,
-            react_type TEXT CHECK(react_type IN ('reaction', 'mention')) DEFAULT 'reaction',
-            description TEXT,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(server_id, react_id)
-        );
-    ''')
+        return False
+
+def fetch_reaction_roles():
+    try:
+        with pool.reader() as connection:
+            return connection.execute("""SELECT message_id, react_emoji, role_id FROM reacts WHERE react_type = 'reaction' AND role_id IS NOT NULL""").fetchall()
+    except Exception as e:
+        print(f"Error fetching reaction roles: {e}")
+        return []
+
+def fetch_guild_reaction_roles(server_id: int):
+    try:
+        with pool.reader() as connection:
+            return connection.execute("""SELECT react_id, channel_id, message_id, react_emoji, role_id, description FROM reacts WHERE server_id = ? AND react_type = 'reaction' ORDER BY react_id""",
+                        (server_id,)).fetchall()
+    except Exception as e:
+        print(f"Error fetching guild reaction roles: {e}")
+        return None
+
+def _next_react_id(unit: UnitOfWork) -> int:
+    unit.execute("UPDATE ticket_sequence SET value = value + 1 WHERE name = 'reacts'")
+    return unit.fetchone("SELECT value FROM ticket_sequence WHERE name = 'reacts'")[0]
+
+def add_reaction_role(server_id: int, channel_id: int, message_id: int, react_emoji: str, role_id: int, description: Optional[str] = None) -> Optional[int]:
+    try:
+        with transaction() as unit:
+            react_id = _next_react_id(unit)
+            unit.execute("""INSERT INTO reacts (server_id, react_id, channel_id, message_id, react_emoji, react_type, description, role_id) VALUES (?, ?, ?, ?, ?, 'reaction', ?, ?)""",
+                        (server_id, react_id, channel_id, message_id, react_emoji, description, role_id))
+        return react_id
+    except sqlite3.IntegrityError:
+        return None
+    except Exception as e:
+        print(f"Error adding reaction role: {e}")
+        return None
+
+def remove_reaction_roles(server_id: int, message_id: int, react_emoji: Optional[str] = None) -> int:
+    try:
+        with pool.writer() as connection:
+            if react_emoji is None:
+                return connection.execute("""DELETE FROM reacts WHERE server_id = ? AND message_id = ? AND react_type = 'reaction'""",
+                            (server_id, message_id)).rowcount
+            return connection.execute("""DELETE FROM reacts WHERE server_id = ? AND message_id = ? AND react_emoji = ? AND react_type = 'reaction'""",
+                        (server_id, message_id, react_emoji)).rowcount
+    except Exception as e:
+        print(f"Error removing reaction role: {e}")
+        return 0
+
+def fetch_triggers():
+    try:
+        with pool.reader() as connection:
+            return connection.execute("""SELECT react_id, server_id, channel_id, trigger, react_emoji FROM reacts WHERE react_type = 'mention' AND trigger IS NOT NULL""").fetchall()
+    except Exception as e:
+        print(f"Error fetching triggers: {e}")
+        return []
+
+def fetch_guild_triggers(server_id: int):
+    try:
+        with pool.reader() as connection:
+            return connection.execute("""SELECT react_id, channel_id, trigger, react_emoji, description FROM reacts WHERE server_id = ? AND react_type = 'mention' ORDER BY trigger""",
+                        (server_id,)).fetchall()
+    except Exception as e:
+        print(f"Error fetching guild triggers: {e}")
+        return None
+
+def add_trigger(server_id: int, channel_id: Optional[int], trigger: str, react_emoji: str, description: Optional[str] = None) -> Optional[int]:
+    try:
+        with transaction() as unit:
+            react_id = _next_react_id(unit)
+            unit.execute("""INSERT INTO reacts (server_id, react_id, channel_id, react_emoji, react_type, description, trigger) VALUES (?, ?, ?, ?, 'mention', ?, ?)""",
+                        (server_id, react_id, channel_id, react_emoji, description, trigger))
+        return react_id
+    except sqlite3.IntegrityError:
+        return None
+    except Exception as e:
+        print(f"Error adding trigger: {e}")
+        return None
+
+def remove_trigger(server_id: int, trigger: str) -> Optional[int]:
+    try:
+        with transaction() as unit:
+            result = unit.fetchone("""SELECT react_id FROM reacts WHERE server_id = ? AND trigger = ? AND react_type = 'mention'""", (server_id, trigger))
+            if result is None:
+                return None
+            unit.execute('''DELETE FROM reacts WHERE react_id = ?''', (result[0],))
+        return result[0]
+    except Exception as e:
+        print(f"Error removing trigger: {e}")
+        return None
+
+def close_database():
+    _db_executor.shutdown(wait=True)
+    pool.close()
 
 async def setup_database(client):
     try:
-        conn = sqlite3.connect('db/mydatabase.db')
-        cursor = conn.cursor()
         print(f"[{datetime.datetime.now()}] [\033[1;35mCONSOLE\033[0;0m]: Database [\033[1;35mSQLite\033[0;0m] setup.") 
 
         try:
-            for guild in client.guilds:
-                create_tables(cursor)
-            print(f"[{datetime.datetime.now()}] [\033[1;35mCONSOLE\033[0;0m]: tables [\033[1;35mSQLite\033[0;0m] created.")
+            applied = await run_db(run_migrations)
+            print(f"[{datetime.datetime.now()}] [\033[1;35mCONSOLE\033[0;0m]: schema [\033[1;35mSQLite\033[0;0m] at version {applied}.")
+            owners = await run_db(reconcile_open_ticket_counts)
+            print(f"[{datetime.datetime.now()}] [\033[1;35mCONSOLE\033[0;0m]: open ticket counts [\033[1;35mSQLite\033[0;0m] rebuilt for {owners} owners.")
         except Exception as e:
             print(f"[{datetime.datetime.now()}] [\033[91mERROR\033[0;0m]: {e}")
+    except Exception as e:
+        print(f"[{datetime.datetime.now()}] [\033[91mERROR\033[0;0m]: {e}")
+
+async def run_db(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, functools.partial(func, *args, **kwargs))
+
+def _to_async(func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_db(func, *args, **kwargs)
+    return wrapper
 
-        conn.commit()
-        conn.close()
+async def fetch_guild_config_async(server_id: int) -> Optional[GuildConfig]:
+    cached = config_cache.get(server_id)
+    if cached is not MISS:
+        return cached
+    return await run_db(_load_guild_config, server_id)
+
+async def get_log_channel_id_async(server_id):
+    try:
+        config = await fetch_guild_config_async(server_id)
+        return config.log_channel_id if config else None
+    except Exception as e:
+        print(f"Error fetching log channel ID: {e}")
+        return None
+
+async def fetch_config_async(server_id: int):
+    try:
+        config = await fetch_guild_config_async(server_id)
+        return config.as_tuple() if config else None
+    except Exception as e:
+        print(f"Error fetching config: {e}")
+        return None
+
+async def fetch_admin_role_ids_async(server_id: int) -> Optional[List[int]]:
+    try:
+        config = await fetch_guild_config_async(server_id)
+        return list(config.admin_role_ids) if config else []
+    except Exception as e:
+        print(f"Error fetching admin role IDs: {e}")
+        return None
+
+async def fetch_ticket_categories_async(server_id: int) -> Optional[List[str]]:
+    try:
+        config = await fetch_guild_config_async(server_id)
+        return list(config.ticket_categories) if config else []
     except Exception as e:
-        print(f"[{datetime.datetime.now()}] [\033[91mERROR\033[0;0m]: {e}")
\ No newline at end of file
+        print(f"Error fetching ticket categories: {e}")
+        return None
+
+execute_select_async = _to_async(execute_select)
+execute_query_async = _to_async(execute_query)
+execute_transaction_async = _to_async(execute_transaction)
+create_ticket_async = _to_async(create_ticket)
+close_ticket_async = _to_async(close_ticket)
+close_tickets_async = _to_async(close_tickets)
+fetch_ticket_async = _to_async(fetch_ticket)
+save_transcript_async = _to_async(save_transcript)
+fetch_transcript_async = _to_async(fetch_transcript)
+fetch_pending_archives_async = _to_async(fetch_pending_archives)
+finish_pending_archive_async = _to_async(finish_pending_archive)
+fetch_ticket_messages_async = _to_async(fetch_ticket_messages)
+search_tickets_async = _to_async(search_tickets)
+fetch_ticket_stats_async = _to_async(fetch_ticket_stats)
+escalate_ticket_priority_async = _to_async(escalate_ticket_priority)
+assign_ticket_async = _to_async(assign_ticket)
+fetch_assigned_tickets_async = _to_async(fetch_assigned_tickets)
+fetch_category_admins_async = _to_async(fetch_category_admins)
+add_category_admin_async = _to_async(add_category_admin)
+remove_category_admin_async = _to_async(remove_category_admin)
+fetch_reaction_roles_async = _to_async(fetch_reaction_roles)
+fetch_guild_reaction_roles_async = _to_async(fetch_guild_reaction_roles)
+add_reaction_role_async = _to_async(add_reaction_role)
+remove_reaction_roles_async = _to_async(remove_reaction_roles)
+fetch_triggers_async = _to_async(fetch_triggers)
+fetch_guild_triggers_async = _to_async(fetch_guild_triggers)
+add_trigger_async = _to_async(add_trigger)
+remove_trigger_async = _to_async(remove_trigger)
+fetch_ticket_timers_async = _to_async(fetch_ticket_timers)
+fetch_ticket_page_async = _to_async(fetch_ticket_page)
+fetch_owner_ticket_count_async = _to_async(fetch_owner_ticket_count)
+generate_ticket_id_async = _to_async(generate_ticket_id)
+insert_config_async = _to_async(insert_config)
+update_config_async = _to_async(update_config)
+add_admin_role_async = _to_async(add_admin_role)
+delete_admin_role_async = _to_async(delete_admin_role)
+add_ticket_category_async = _to_async(add_ticket_category)
+is_guild_admin_async = _to_async(is_guild_admin)
+is_ticket_category_async = _to_async(is_ticket_category)
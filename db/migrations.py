@@ -0,0 +1,443 @@
+import ast
+import datetime
+import json
+import sqlite3
+from typing import Optional
+
+from db.connection import pool
+from db.stats import backfill_ticket_stats
+
+def create_tables(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS config (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            server_id INTEGER NOT NULL UNIQUE,
+            prefix TEXT DEFAULT '!',
+            admin_role_ids JSON,
+            log_channel_id INTEGER,
+            max_tickets_per_user INTEGER,
+            tickets_categories JSON,
+            other_settings JSON,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tickets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            server_id INTEGER NOT NULL,
+            ticket_id INTEGER NOT NULL UNIQUE,
+            title TEXT,
+            description TEXT,
+            category TEXT,
+            channel_id INTEGER NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            status TEXT CHECK(status IN ('open', 'closed', 'in-progress')) DEFAULT 'open',
+            priority TEXT CHECK(priority IN ('low', 'medium', 'high')) DEFAULT 'medium',
+            assigned_to INTEGER,
+            owner INTEGER,
+            comments JSON
+        );
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ticket_permissions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ticket_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            role TEXT CHECK(role IN ('admin', 'user')) DEFAULT 'user',
+            FOREIGN KEY (ticket_id) REFERENCES tickets(id)
+        );
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS reacts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            server_id INTEGER NOT NULL,
+            react_id INTEGER NOT NULL UNIQUE,
+            channel_id INTEGER,
+            message_id INTEGER,
+            react_emoji TEXT,
+            react_type TEXT CHECK(react_type IN ('reaction', 'mention')) DEFAULT 'reaction',
+            description TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(server_id, react_id)
+        );
+    ''')
+
+def create_ticket_sequence(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ticket_sequence (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+    ''')
+
+    cursor.execute('''
+        INSERT OR IGNORE INTO ticket_sequence (name, value)
+        SELECT 'tickets', COALESCE(MAX(ticket_id), 0) FROM tickets
+    ''')
+
+def create_ticket_indexes(cursor):
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tickets_owner_status
+        ON tickets (server_id, owner, status)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tickets_owner_ticket
+        ON tickets (server_id, owner, ticket_id)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_ticket_permissions_ticket
+        ON ticket_permissions (ticket_id, user_id, role)
+    ''')
+
+def _parse_id_list(value) -> list:
+    if not value:
+        return []
+    try:
+        ids = json.loads(value)
+    except ValueError:
+        ids = ast.literal_eval(value)
+    return [int(item) for item in ids or []]
+
+def normalize_guild_lists(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS guild_admins (
+            server_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            PRIMARY KEY (server_id, user_id)
+        ) WITHOUT ROWID;
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS guild_ticket_categories (
+            server_id INTEGER NOT NULL,
+            category_id INTEGER NOT NULL,
+            PRIMARY KEY (server_id, category_id)
+        ) WITHOUT ROWID;
+    ''')
+
+    rows = cursor.execute('''SELECT server_id, admin_role_ids, tickets_categories FROM config''').fetchall()
+    for server_id, admin_role_ids, tickets_categories in rows:
+        cursor.executemany('''INSERT OR IGNORE INTO guild_admins (server_id, user_id) VALUES (?, ?)''',
+                    [(server_id, user_id) for user_id in _parse_id_list(admin_role_ids)])
+        cursor.executemany('''INSERT OR IGNORE INTO guild_ticket_categories (server_id, category_id) VALUES (?, ?)''',
+                    [(server_id, category_id) for category_id in _parse_id_list(tickets_categories)])
+
+    cursor.execute('''UPDATE config SET admin_role_ids = NULL, tickets_categories = NULL''')
+
+def create_ticket_events(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ticket_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            server_id INTEGER NOT NULL,
+            ticket_id INTEGER NOT NULL,
+            actor_id INTEGER,
+            event TEXT NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_ticket_events_ticket
+        ON ticket_events (server_id, ticket_id)
+    ''')
+
+def create_owner_ticket_counts(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS owner_ticket_counts (
+            server_id INTEGER NOT NULL,
+            owner INTEGER NOT NULL,
+            total INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (server_id, owner)
+        ) WITHOUT ROWID;
+    ''')
+
+    cursor.execute('''
+        INSERT OR REPLACE INTO owner_ticket_counts (server_id, owner, total)
+        SELECT server_id, owner, COUNT(*) FROM tickets WHERE owner IS NOT NULL GROUP BY server_id, owner
+    ''')
+
+def create_open_ticket_counts(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS open_ticket_counts (
+            server_id INTEGER NOT NULL,
+            owner INTEGER NOT NULL,
+            open_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (server_id, owner)
+        ) WITHOUT ROWID;
+    ''')
+
+def add_channel_pool_size(cursor):
+    cursor.execute('''ALTER TABLE config ADD COLUMN channel_pool_size INTEGER NOT NULL DEFAULT 0''')
+
+def create_ticket_timers(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ticket_timers (
+            ticket_id INTEGER NOT NULL,
+            action TEXT CHECK(action IN ('reminder', 'escalate', 'auto_close')) NOT NULL,
+            server_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            due_at REAL NOT NULL,
+            PRIMARY KEY (ticket_id, action)
+        ) WITHOUT ROWID;
+    ''')
+
+def create_ticket_transcripts(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ticket_transcripts (
+            ticket_id INTEGER PRIMARY KEY,
+            server_id INTEGER NOT NULL,
+            path TEXT NOT NULL,
+            message_count INTEGER NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+    ''')
+
+def create_ticket_messages(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ticket_messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ticket_id INTEGER NOT NULL,
+            message_id INTEGER,
+            author_id INTEGER,
+            created_at TEXT NOT NULL,
+            content TEXT,
+            attachments JSON
+        );
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_ticket_messages_ticket
+        ON ticket_messages (ticket_id, created_at)
+    ''')
+
+    rows = cursor.execute('''SELECT ticket_id, created_at, comments FROM tickets WHERE comments IS NOT NULL''').fetchall()
+    for ticket_id, created_at, comments in rows:
+        try:
+            entries = json.loads(comments) or []
+        except ValueError:
+            continue
+        cursor.executemany('''INSERT INTO ticket_messages (ticket_id, author_id, created_at, content, attachments) VALUES (?, ?, ?, ?, '[]')''',
+                    [(ticket_id, entry.get("author") if isinstance(entry, dict) else None,
+                      entry.get("created_at", created_at) if isinstance(entry, dict) else created_at,
+                      entry.get("content") if isinstance(entry, dict) else str(entry)) for entry in entries])
+    cursor.execute('''UPDATE tickets SET comments = NULL''')
+
+def create_ticket_search(cursor):
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts
+        USING fts5 (server_id, title, description, content='')
+    ''')
+
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS ticket_messages_fts
+        USING fts5 (server_id, content, content='')
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS tickets_fts_insert AFTER INSERT ON tickets BEGIN
+            INSERT INTO tickets_fts (rowid, server_id, title, description) VALUES (new.id, new.server_id, new.title, new.description);
+        END
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS tickets_fts_delete AFTER DELETE ON tickets BEGIN
+            INSERT INTO tickets_fts (tickets_fts, rowid, server_id, title, description) VALUES ('delete', old.id, old.server_id, old.title, old.description);
+        END
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS tickets_fts_update AFTER UPDATE OF title, description ON tickets BEGIN
+            INSERT INTO tickets_fts (tickets_fts, rowid, server_id, title, description) VALUES ('delete', old.id, old.server_id, old.title, old.description);
+            INSERT INTO tickets_fts (rowid, server_id, title, description) VALUES (new.id, new.server_id, new.title, new.description);
+        END
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS ticket_messages_fts_insert AFTER INSERT ON ticket_messages BEGIN
+            INSERT INTO ticket_messages_fts (rowid, server_id, content)
+            SELECT new.id, server_id, new.content FROM tickets WHERE ticket_id = new.ticket_id;
+        END
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS ticket_messages_fts_delete AFTER DELETE ON ticket_messages BEGIN
+            INSERT INTO ticket_messages_fts (ticket_messages_fts, rowid, server_id, content)
+            SELECT 'delete', old.id, server_id, old.content FROM tickets WHERE ticket_id = old.ticket_id;
+        END
+    ''')
+
+    cursor.execute('''INSERT INTO tickets_fts (rowid, server_id, title, description) SELECT id, server_id, title, description FROM tickets''')
+    cursor.execute('''
+        INSERT INTO ticket_messages_fts (rowid, server_id, content)
+        SELECT ticket_messages.id, tickets.server_id, ticket_messages.content
+        FROM ticket_messages JOIN tickets ON tickets.ticket_id = ticket_messages.ticket_id
+    ''')
+
+def create_ticket_stats(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ticket_stats_hourly (
+            server_id INTEGER NOT NULL,
+            hour TEXT NOT NULL,
+            category INTEGER NOT NULL,
+            created INTEGER NOT NULL DEFAULT 0,
+            closed INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (server_id, hour, category)
+        ) WITHOUT ROWID;
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ticket_stats_daily (
+            server_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            category INTEGER NOT NULL,
+            created INTEGER NOT NULL DEFAULT 0,
+            closed INTEGER NOT NULL DEFAULT 0,
+            close_seconds REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (server_id, day, category)
+        ) WITHOUT ROWID;
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ticket_close_times (
+            server_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            closed INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (server_id, day, bucket)
+        ) WITHOUT ROWID;
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ticket_admin_load (
+            server_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            admin_id INTEGER NOT NULL,
+            closed INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (server_id, day, admin_id)
+        ) WITHOUT ROWID;
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ticket_open_by_category (
+            server_id INTEGER NOT NULL,
+            category INTEGER NOT NULL,
+            open_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (server_id, category)
+        ) WITHOUT ROWID;
+    ''')
+
+    backfill_ticket_stats(cursor)
+
+def create_ticket_routing(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS category_admins (
+            server_id INTEGER NOT NULL,
+            category_id INTEGER NOT NULL,
+            admin_id INTEGER NOT NULL,
+            PRIMARY KEY (server_id, category_id, admin_id)
+        ) WITHOUT ROWID;
+    ''')
+
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tickets_assigned
+        ON tickets (server_id, assigned_to) WHERE status != 'closed'
+    """)
+
+def add_react_roles(cursor):
+    columns = [row[1] for row in cursor.execute('''PRAGMA table_info(reacts)''').fetchall()]
+    if "role_id" not in columns:
+        cursor.execute('''ALTER TABLE reacts ADD COLUMN role_id INTEGER''')
+
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_reacts_message_emoji
+        ON reacts (message_id, react_emoji) WHERE react_type = 'reaction'
+    """)
+
+def add_react_triggers(cursor):
+    columns = [row[1] for row in cursor.execute('''PRAGMA table_info(reacts)''').fetchall()]
+    if "trigger" not in columns:
+        cursor.execute('''ALTER TABLE reacts ADD COLUMN trigger TEXT''')
+
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_reacts_trigger
+        ON reacts (server_id, trigger) WHERE react_type = 'mention'
+    """)
+
+def create_react_sequence(cursor):
+    cursor.execute('''
+        INSERT OR IGNORE INTO ticket_sequence (name, value)
+        SELECT 'reacts', COALESCE(MAX(react_id), 0) FROM reacts
+    ''')
+
+def create_archive_queue(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ticket_archive_queue (
+            ticket_id INTEGER PRIMARY KEY,
+            server_id INTEGER NOT NULL,
+            channel_id INTEGER,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            queued_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_ticket_archive_queue_due
+        ON ticket_archive_queue (attempts, queued_at)
+    ''')
+
+MIGRATIONS = [
+    (1, "initial schema", create_tables),
+    (2, "ticket id sequence", create_ticket_sequence),
+    (3, "ticket lookup indexes", create_ticket_indexes),
+    (4, "normalize admins and ticket categories", normalize_guild_lists),
+    (5, "ticket event log", create_ticket_events),
+    (6, "per-owner ticket counts", create_owner_ticket_counts),
+    (7, "open ticket counts", create_open_ticket_counts),
+    (8, "ticket channel pool size", add_channel_pool_size),
+    (9, "ticket timers", create_ticket_timers),
+    (10, "ticket transcripts", create_ticket_transcripts),
+    (11, "ticket messages", create_ticket_messages),
+    (12, "ticket full-text search", create_ticket_search),
+    (13, "ticket statistics rollups", create_ticket_stats),
+    (14, "ticket routing", create_ticket_routing),
+    (15, "reaction roles", add_react_roles),
+    (16, "mention triggers", add_react_triggers),
+    (17, "reaction id sequence", create_react_sequence),
+    (18, "ticket archive queue", create_archive_queue),
+]
+
+def _current_version(connection: sqlite3.Connection) -> int:
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+    ''')
+    return connection.execute('SELECT COALESCE(MAX(version), 0) FROM schema_migrations').fetchone()[0]
+
+def run_migrations(target: Optional[int] = None) -> int:
+    with pool.writer() as connection:
+        version = _current_version(connection)
+    for migration_version, name, migrate in MIGRATIONS:
+        if migration_version <= version or (target is not None and migration_version > target):
+            continue
+        with pool.writer() as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            pending = _current_version(connection) < migration_version
+            if pending:
+                migrate(connection.cursor())
+                connection.execute('INSERT INTO schema_migrations (version, name) VALUES (?, ?)', (migration_version, name))
+        if pending:
+            print(f"[{datetime.datetime.now()}] [\033[1;35mCONSOLE\033[0;0m]: migration [\033[1;35m{migration_version}\033[0;0m] {name} applied.")
+        version = migration_version
+    return version
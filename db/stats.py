@@ -0,0 +1,131 @@
+import bisect
+import datetime
+from collections import Counter
+from typing import Dict, Optional
+
+CLOSE_TIME_BUCKETS = (300, 900, 1800, 3600, 7200, 14400, 28800, 43200, 86400, 172800, 259200, 604800, 1209600, 2592000)
+
+def _parse_time(value) -> Optional[datetime.datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(str(value).replace("Z", "")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+def _category(category) -> int:
+    try:
+        return int(category)
+    except (TypeError, ValueError):
+        return 0
+
+def close_time_bucket(seconds: float) -> int:
+    return bisect.bisect_left(CLOSE_TIME_BUCKETS, seconds)
+
+def median_close_seconds(buckets: Dict[int, int]) -> Optional[float]:
+    total = sum(buckets.values())
+    if not total:
+        return None
+    seen = 0
+    for bucket in sorted(buckets):
+        count = buckets[bucket]
+        if seen + count >= total / 2:
+            lower = CLOSE_TIME_BUCKETS[bucket - 1] if bucket > 0 else 0
+            upper = CLOSE_TIME_BUCKETS[bucket] if bucket < len(CLOSE_TIME_BUCKETS) else lower * 2
+            return lower + (upper - lower) * (total / 2 - seen) / count
+        seen += count
+    return None
+
+class StatsDelta:
+    def __init__(self):
+        self.hourly = Counter()
+        self.daily = Counter()
+        self.close_seconds = Counter()
+        self.close_buckets = Counter()
+        self.admin_closed = Counter()
+        self.open_by_category = Counter()
+
+    def created(self, server_id: int, category, created_at):
+        created = _parse_time(created_at) or datetime.datetime.utcnow()
+        category = _category(category)
+        self.hourly[(server_id, created.strftime("%Y-%m-%dT%H"), category, "created")] += 1
+        self.daily[(server_id, created.strftime("%Y-%m-%d"), category, "created")] += 1
+        self.open_by_category[(server_id, category)] += 1
+
+    def closed(self, server_id: int, category, created_at, closed_at=None, closed_by: Optional[int] = None, owner: Optional[int] = None):
+        closed = _parse_time(closed_at) or datetime.datetime.utcnow()
+        category = _category(category)
+        day = closed.strftime("%Y-%m-%d")
+        self.hourly[(server_id, closed.strftime("%Y-%m-%dT%H"), category, "closed")] += 1
+        self.daily[(server_id, day, category, "closed")] += 1
+        self.open_by_category[(server_id, category)] -= 1
+
+        created = _parse_time(created_at)
+        if created is not None:
+            seconds = max((closed - created).total_seconds(), 0)
+            self.close_seconds[(server_id, day, category)] += seconds
+            self.close_buckets[(server_id, day, close_time_bucket(seconds))] += 1
+        if closed_by is not None and closed_by != owner:
+            self.admin_closed[(server_id, day, closed_by)] += 1
+
+    def apply(self, cursor):
+        cursor.executemany('''
+            INSERT INTO ticket_stats_hourly (server_id, hour, category, created, closed) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (server_id, hour, category) DO UPDATE SET created = created + excluded.created, closed = closed + excluded.closed
+        ''', [(server_id, hour, category, count if kind == "created" else 0, count if kind == "closed" else 0)
+              for (server_id, hour, category, kind), count in self.hourly.items()])
+
+        cursor.executemany('''
+            INSERT INTO ticket_stats_daily (server_id, day, category, created, closed, close_seconds) VALUES (?, ?, ?, ?, ?, 0)
+            ON CONFLICT (server_id, day, category) DO UPDATE SET created = created + excluded.created, closed = closed + excluded.closed
+        ''', [(server_id, day, category, count if kind == "created" else 0, count if kind == "closed" else 0)
+              for (server_id, day, category, kind), count in self.daily.items()])
+
+        cursor.executemany('''
+            UPDATE ticket_stats_daily SET close_seconds = close_seconds + ? WHERE server_id = ? AND day = ? AND category = ?
+        ''', [(seconds, server_id, day, category) for (server_id, day, category), seconds in self.close_seconds.items()])
+
+        cursor.executemany('''
+            INSERT INTO ticket_close_times (server_id, day, bucket, closed) VALUES (?, ?, ?, ?)
+            ON CONFLICT (server_id, day, bucket) DO UPDATE SET closed = closed + excluded.closed
+        ''', [(server_id, day, bucket, count) for (server_id, day, bucket), count in self.close_buckets.items()])
+
+        cursor.executemany('''
+            INSERT INTO ticket_admin_load (server_id, day, admin_id, closed) VALUES (?, ?, ?, ?)
+            ON CONFLICT (server_id, day, admin_id) DO UPDATE SET closed = closed + excluded.closed
+        ''', [(server_id, day, admin_id, count) for (server_id, day, admin_id), count in self.admin_closed.items()])
+
+        cursor.executemany('''
+            INSERT INTO ticket_open_by_category (server_id, category, open_count) VALUES (?, ?, MAX(?, 0))
+            ON CONFLICT (server_id, category) DO UPDATE SET open_count = MAX(open_count + ?, 0)
+        ''', [(server_id, category, delta, delta) for (server_id, category), delta in self.open_by_category.items() if delta])
+
+def backfill_ticket_stats(cursor) -> int:
+    for table in ("ticket_stats_hourly", "ticket_stats_daily", "ticket_close_times", "ticket_admin_load", "ticket_open_by_category"):
+        cursor.execute(f'''DELETE FROM {table}''')
+
+    delta = StatsDelta()
+    rows = cursor.execute("""
+        SELECT t.server_id, t.category, t.created_at, t.status, t.owner, COALESCE(e.closed_at, t.updated_at), e.actor_id
+        FROM tickets t
+        LEFT JOIN (
+            SELECT ticket_id, actor_id, MAX(created_at) AS closed_at FROM ticket_events
+            WHERE event IN ('closed', 'auto_closed') GROUP BY ticket_id
+        ) AS e ON e.ticket_id = t.ticket_id
+    """)
+    count = 0
+    for server_id, category, created_at, status, owner, closed_at, closed_by in rows:
+        delta.created(server_id, category, created_at)
+        if status == "closed":
+            delta.closed(server_id, category, created_at, closed_at, closed_by, owner)
+        count += 1
+    delta.apply(cursor)
+    return count
+
+if __name__ == "__main__":
+    from db.connection import pool
+
+    with pool.writer() as connection:
+        connection.execute('BEGIN IMMEDIATE')
+        count = backfill_ticket_stats(connection.cursor())
+    print(f"[{datetime.datetime.now()}] [\033[1;35mCONSOLE\033[0;0m]: ticket statistics rebuilt from {count} tickets.")
@@ -0,0 +1,155 @@
+import asyncio
+import datetime
+import json
+import logging
+import sqlite3
+from typing import List, Optional, Tuple
+
+from db.database import run_db, run_statements
+
+WRITE_QUEUE_SIZE = 10000
+WRITE_BATCH_SIZE = 500
+WRITE_FLUSH_INTERVAL = 0.5
+WRITE_MAX_ATTEMPTS = 5
+WRITE_RETRY_DELAY = 0.2
+
+log = logging.getLogger(__name__)
+
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    return getattr(error, "sqlite_errorcode", None) in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED) or "locked" in str(error)
+
+class WriteBehindQueue:
+    def __init__(self, maxsize: int = WRITE_QUEUE_SIZE, batch_size: int = WRITE_BATCH_SIZE, flush_interval: float = WRITE_FLUSH_INTERVAL):
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._batch: List[Tuple[str, tuple]] = []
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.retries = 0
+        self.batches = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+        self.max_depth = 0
+
+    def start(self):
+        if self._task is None or self._task.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue(maxsize=self.maxsize)
+            self._task = asyncio.create_task(self._run())
+
+    async def submit(self, query: str, params: tuple = ()):
+        if self._queue is None:
+            raise RuntimeError("Write-behind queue is not running")
+        await self._queue.put((query, params))
+        self.enqueued += 1
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            stopping = item is None
+            if not stopping:
+                self._batch.append(item)
+            deadline = loop.time() + self.flush_interval
+            while not stopping and len(self._batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                stopping = item is None
+                if not stopping:
+                    self._batch.append(item)
+            await self._flush()
+
+    async def _flush(self):
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+
+        written = await self._write(batch)
+        self.written += written
+        self.failed += len(batch) - written
+        self.batches += 1
+        self.last_batch_size = len(batch)
+        self.max_batch_size = max(self.max_batch_size, len(batch))
+
+    async def _write(self, batch: List[Tuple[str, tuple]]) -> int:
+        statements = []
+        for query, params in batch:
+            if statements and statements[-1][0] == query:
+                statements[-1][1].append(params)
+            else:
+                statements.append((query, [params]))
+
+        for attempt in range(1, WRITE_MAX_ATTEMPTS + 1):
+            try:
+                await run_db(run_statements, statements)
+                return len(batch)
+            except sqlite3.IntegrityError as e:
+                if len(batch) == 1:
+                    query, params = batch[0]
+                    log.error("write-behind dropped %s with %s: %s", " ".join(query.split()[:3]), params, e)
+                    return 0
+                middle = len(batch) // 2
+                return await self._write(batch[:middle]) + await self._write(batch[middle:])
+            except sqlite3.OperationalError as e:
+                if not _is_busy(e) or attempt == WRITE_MAX_ATTEMPTS:
+                    error = e
+                    break
+                self.retries += 1
+                await asyncio.sleep(WRITE_RETRY_DELAY * (2 ** (attempt - 1)))
+            except Exception as e:
+                error = e
+                break
+        log.error("write-behind dropped a batch of %d writes: %s", len(batch), error)
+        return 0
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            await self._queue.put(None)
+            await self._task
+        self._task = None
+        while self._queue is not None and not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                self._batch.append(item)
+            if len(self._batch) >= self.batch_size:
+                await self._flush()
+        await self._flush()
+
+    def stats(self) -> dict:
+        return {
+            "depth": self._queue.qsize() if self._queue else 0,
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "failed": self.failed,
+            "retries": self.retries,
+            "batches": self.batches,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size": self.max_batch_size,
+            "avg_batch_size": (self.written + self.failed) / self.batches if self.batches else 0.0
+        }
+
+write_behind = WriteBehindQueue()
+
+async def record_ticket_event(server_id: int, ticket_id: int, actor_id: Optional[int], event: str):
+    await write_behind.submit(
+        '''INSERT INTO ticket_events (server_id, ticket_id, actor_id, event, created_at) VALUES (?, ?, ?, ?, ?)''',
+        (server_id, ticket_id, actor_id, event, datetime.datetime.utcnow().isoformat())
+    )
+
+async def record_ticket_message(ticket_id: int, message_id: int, author_id: int, created_at: str, content: str, attachments: List[str]):
+    await write_behind.submit(
+        '''INSERT INTO ticket_messages (ticket_id, message_id, author_id, created_at, content, attachments) VALUES (?, ?, ?, ?, ?, ?)''',
+        (ticket_id, message_id, author_id, created_at, content, json.dumps(attachments))
+    )
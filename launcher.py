@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import signal
+import sys
+
+from db.migrations import run_migrations
+from db.connection import pool
+from utils.sharding import cluster_ranges, format_shard_ids
+
+IDENTIFY_DELAY = 5.0
+RESTART_BASE_DELAY = 5.0
+RESTART_MAX_DELAY = 300.0
+HEALTHY_AFTER = 600.0
+
+class Cluster:
+    def __init__(self, cluster_id: int, shard_ids, shard_count: int):
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.process = None
+        self.restarts = 0
+
+    @property
+    def name(self) -> str:
+        return f"cluster {self.cluster_id} (shards {format_shard_ids(self.shard_ids)})"
+
+    async def spawn(self):
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "bot.py"),
+            "--cluster-id", str(self.cluster_id),
+            "--shard-ids", ",".join(str(shard_id) for shard_id in self.shard_ids),
+            "--shard-count", str(self.shard_count)
+        )
+        print(f"[{datetime.datetime.now()}] [\033[1;36mCONSOLE\033[0;0m]: {self.name} started with pid {self.process.pid}")
+
+    async def supervise(self, stopping: asyncio.Event):
+        delay = RESTART_BASE_DELAY
+        while not stopping.is_set():
+            started = asyncio.get_running_loop().time()
+            code = await self.process.wait()
+            if stopping.is_set():
+                return
+            if asyncio.get_running_loop().time() - started > HEALTHY_AFTER:
+                delay = RESTART_BASE_DELAY
+            print(f"[{datetime.datetime.now()}] [\033[91mERROR\033[0;0m]: {self.name} exited with code {code}, restarting in {delay:.0f}s")
+            try:
+                await asyncio.wait_for(stopping.wait(), delay)
+                return
+            except asyncio.TimeoutError:
+                pass
+            self.restarts += 1
+            delay = min(delay * 2, RESTART_MAX_DELAY)
+            await self.spawn()
+
+    def terminate(self):
+        if self.process is not None and self.process.returncode is None:
+            self.process.send_signal(signal.SIGINT)
+
+async def main():
+    with open('config.json', 'r') as f:
+        config = json.load(f)
+
+    parser = argparse.ArgumentParser(description="Run the bot as several processes, each owning a range of shards.")
+    parser.add_argument("--clusters", type=int, default=config.get("clusters", 1))
+    parser.add_argument("--shards", type=int, default=config.get("shard_count"))
+    args = parser.parse_args()
+    shard_count = args.shards or args.clusters
+
+    version = run_migrations()
+    pool.close()
+    print(f"[{datetime.datetime.now()}] [\033[1;35mCONSOLE\033[0;0m]: schema [\033[1;35mSQLite\033[0;0m] at version {version}.")
+
+    clusters = [Cluster(cluster_id, shard_ids, shard_count) for cluster_id, shard_ids in enumerate(cluster_ranges(shard_count, args.clusters))]
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stopping.set)
+        except NotImplementedError:
+            pass
+
+    supervisors = []
+    for cluster in clusters:
+        if stopping.is_set():
+            break
+        await cluster.spawn()
+        supervisors.append(asyncio.create_task(cluster.supervise(stopping)))
+        try:
+            await asyncio.wait_for(stopping.wait(), IDENTIFY_DELAY * len(cluster.shard_ids))
+        except asyncio.TimeoutError:
+            pass
+
+    await stopping.wait()
+    print(f"[{datetime.datetime.now()}] [\033[1;36mCONSOLE\033[0;0m]: stopping {len(clusters)} clusters")
+    for cluster in clusters:
+        cluster.terminate()
+    await asyncio.gather(*(cluster.process.wait() for cluster in clusters if cluster.process is not None))
+    for supervisor in supervisors:
+        supervisor.cancel()
+
+if __name__ == "__main__":
+    asyncio.run(main())
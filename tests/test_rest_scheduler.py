@@ -0,0 +1,47 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("discord")
+
+from utils.rest_scheduler import RestScheduler, BACKGROUND, INTERACTIVE
+
+def test_background_burst_on_one_route_does_not_block_other_routes():
+    async def scenario():
+        scheduler = RestScheduler()
+
+        async def slow_upload():
+            await asyncio.sleep(0.2)
+
+        for _ in range(5):
+            scheduler.schedule(slow_upload, guild_id=1, route="log_send", priority=BACKGROUND)
+        await asyncio.sleep(0.01)
+
+        async def create_channel():
+            return time.perf_counter()
+
+        queued = time.perf_counter()
+        started = await scheduler.run(create_channel, guild_id=1, route="channel_create", priority=INTERACTIVE)
+        await asyncio.gather(*scheduler._background)
+        return started - queued
+
+    assert asyncio.run(scenario()) < 0.1
+
+def test_route_gate_keeps_calls_on_one_route_serial():
+    async def scenario():
+        scheduler = RestScheduler()
+        running = 0
+        peak = 0
+
+        async def call():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        await asyncio.gather(*(scheduler.run(call, guild_id=1, route="channel_send") for _ in range(4)))
+        return peak
+
+    assert asyncio.run(scenario()) == 1
@@ -0,0 +1,52 @@
+import pytest
+
+from db.connection import pool
+from db.database import add_admin_role, assign_ticket, create_ticket, insert_config
+from db.migrations import run_migrations
+
+SERVER_ID = 1
+OWNER_ID = 10
+GUILD_ADMIN_ID = 20
+
+@pytest.fixture(autouse=True)
+def database(tmp_path, monkeypatch):
+    pool.close()
+    monkeypatch.setattr(pool, "path", str(tmp_path / "tickets.db"))
+    monkeypatch.setattr(pool, "_closed", False)
+    run_migrations()
+    insert_config(SERVER_ID, [GUILD_ADMIN_ID], None)
+    create_ticket(SERVER_ID, 1, 100, "title", "description", 5, "2026-01-01T00:00:00", OWNER_ID, [GUILD_ADMIN_ID])
+    yield
+    pool.close()
+    monkeypatch.setattr(pool, "_closed", False)
+
+def admins_of(ticket_id):
+    with pool.reader() as connection:
+        return {row[0] for row in connection.execute("SELECT user_id FROM ticket_permissions WHERE ticket_id = ? AND role = 'admin'", (ticket_id,))}
+
+def assignee_of(ticket_id):
+    with pool.reader() as connection:
+        return connection.execute("SELECT assigned_to FROM tickets WHERE ticket_id = ?", (ticket_id,)).fetchone()[0]
+
+def test_reassign_revokes_previous_assignee():
+    assert assign_ticket(SERVER_ID, 1, 30) == (1, None)
+    assert assign_ticket(SERVER_ID, 1, 40) == (1, 30)
+    assert assignee_of(1) == 40
+    assert admins_of(1) == {GUILD_ADMIN_ID, 40}
+
+def test_reassign_keeps_guild_admin_access():
+    assert assign_ticket(SERVER_ID, 1, GUILD_ADMIN_ID) == (1, None)
+    assert assign_ticket(SERVER_ID, 1, 40) == (1, None)
+    assert admins_of(1) == {GUILD_ADMIN_ID, 40}
+
+def test_reassign_keeps_admin_added_after_assignment():
+    assign_ticket(SERVER_ID, 1, 30)
+    add_admin_role(SERVER_ID, 30)
+    assert assign_ticket(SERVER_ID, 1, 40) == (1, None)
+    assert 30 in admins_of(1)
+
+def test_closed_ticket_cannot_be_assigned():
+    with pool.writer() as connection:
+        connection.execute("UPDATE tickets SET status = 'closed' WHERE ticket_id = 1")
+    assert assign_ticket(SERVER_ID, 1, 30) == (0, None)
+    assert assignee_of(1) is None
@@ -0,0 +1,88 @@
+import bisect
+import difflib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MAX_CHOICES = 25
+
+class GuildCategoryIndex:
+    def __init__(self, category_ids: Iterable[int]):
+        self.category_ids = set(category_ids)
+        self._keys: List[str] = []
+        self._entries: List[Tuple[str, str, int]] = []
+        self._names: Dict[int, str] = {}
+
+    def add(self, category_id: int, name: str):
+        if category_id not in self.category_ids:
+            return
+        self.remove(category_id)
+        key = name.casefold()
+        position = bisect.bisect_left(self._keys, key)
+        self._keys.insert(position, key)
+        self._entries.insert(position, (key, name, category_id))
+        self._names[category_id] = name
+
+    def remove(self, category_id: int):
+        name = self._names.pop(category_id, None)
+        if name is None:
+            return
+        key = name.casefold()
+        position = bisect.bisect_left(self._keys, key)
+        while position < len(self._entries) and self._keys[position] == key:
+            if self._entries[position][2] == category_id:
+                del self._keys[position]
+                del self._entries[position]
+                return
+            position += 1
+
+    def search(self, current: str, limit: int = MAX_CHOICES) -> List[Tuple[str, int]]:
+        query = current.casefold().strip()
+        if not query:
+            return [(name, category_id) for _, name, category_id in self._entries[:limit]]
+
+        start = bisect.bisect_left(self._keys, query)
+        end = bisect.bisect_right(self._keys, query + "\uffff", lo=start)
+        results = [(name, category_id) for _, name, category_id in self._entries[start:min(end, start + limit)]]
+        if len(results) >= limit:
+            return results
+
+        seen = {category_id for _, category_id in results}
+        for key, name, category_id in self._entries:
+            if len(results) >= limit:
+                return results
+            if category_id not in seen and query in key:
+                results.append((name, category_id))
+                seen.add(category_id)
+
+        if not results:
+            by_key = {key: (name, category_id) for key, name, category_id in self._entries}
+            results = [by_key[key] for key in difflib.get_close_matches(query, list(by_key), n=limit, cutoff=0.5)]
+        return results
+
+class CategoryIndexes:
+    def __init__(self):
+        self._guilds: Dict[int, GuildCategoryIndex] = {}
+
+    def get(self, guild_id: int) -> Optional[GuildCategoryIndex]:
+        return self._guilds.get(guild_id)
+
+    def build(self, guild, category_ids: Iterable[int]) -> GuildCategoryIndex:
+        index = GuildCategoryIndex(category_ids)
+        for category in guild.categories:
+            index.add(category.id, category.name)
+        self._guilds[guild.id] = index
+        return index
+
+    def invalidate(self, guild_id: int):
+        self._guilds.pop(guild_id, None)
+
+    def channel_changed(self, channel):
+        index = self._guilds.get(channel.guild.id)
+        if index is not None:
+            index.add(channel.id, channel.name)
+
+    def channel_deleted(self, channel):
+        index = self._guilds.get(channel.guild.id)
+        if index is not None:
+            index.remove(channel.id)
+
+category_indexes = CategoryIndexes()
@@ -0,0 +1,131 @@
+import asyncio
+import datetime
+from typing import Dict, List, Optional, Set
+
+import discord
+
+from db.database import fetch_guild_config_async
+from utils.rest_scheduler import rest_scheduler, BACKGROUND
+
+POOL_CHANNEL_NAME = "ticket-pool"
+MAX_POOL_SIZE = 10
+REFILL_DELAY = 2.0
+
+class ChannelPool:
+    def __init__(self):
+        self.client: Optional[discord.Client] = None
+        self._channels: Dict[int, Dict[int, List[int]]] = {}
+        self._discovered: Set[int] = set()
+        self._pending: Set[int] = set()
+        self._refill_all = False
+        self._refill_needed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.claimed = 0
+        self.created = 0
+
+    def start(self, client: discord.Client):
+        self.client = client
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self.request_refill()
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def request_refill(self, guild_id: Optional[int] = None):
+        if guild_id is None:
+            self._refill_all = True
+        else:
+            self._pending.add(guild_id)
+        self._refill_needed.set()
+
+    def discover(self, guild: discord.Guild, category_ids: Set[int]):
+        for category_id in category_ids:
+            category = guild.get_channel(category_id)
+            if isinstance(category, discord.CategoryChannel):
+                self._channels.setdefault(guild.id, {})[category_id] = [
+                    channel.id for channel in category.text_channels if channel.name == POOL_CHANNEL_NAME
+                ]
+        self._discovered.add(guild.id)
+
+    def forget(self, channel: discord.abc.GuildChannel):
+        channel_ids = self._channels.get(channel.guild.id, {}).get(channel.category_id)
+        if channel_ids and channel.id in channel_ids:
+            channel_ids.remove(channel.id)
+            self.request_refill(channel.guild.id)
+
+    async def claim(self, guild: discord.Guild, category_id: int, channel_name: str, overwrites: dict) -> Optional[discord.TextChannel]:
+        channel_ids = self._channels.get(guild.id, {}).get(category_id)
+        while channel_ids:
+            channel = guild.get_channel(channel_ids.pop())
+            if channel is None:
+                continue
+            try:
+                await rest_scheduler.run(lambda: channel.edit(name=channel_name, overwrites=overwrites), guild_id=guild.id, route="channel_edit")
+            except discord.HTTPException as e:
+                print(f"Error claiming pooled channel: {e}")
+                continue
+            self.claimed += 1
+            self.request_refill(guild.id)
+            return channel
+        return None
+
+    async def _run(self):
+        await self.client.wait_until_ready()
+        while not self.client.is_closed():
+            await self._refill_needed.wait()
+            self._refill_needed.clear()
+            if self._refill_all:
+                guilds = list(self.client.guilds)
+                self._refill_all = False
+            else:
+                guilds = [guild for guild in map(self.client.get_guild, self._pending) if guild is not None]
+            self._pending.clear()
+            for guild in guilds:
+                try:
+                    await self._refill_guild(guild)
+                except Exception as e:
+                    print(f"[{datetime.datetime.now()}] [\033[91mERROR\033[0;0m]: channel pool refill for {guild.id} failed: {e}")
+
+    async def _refill_guild(self, guild: discord.Guild):
+        config = await fetch_guild_config_async(guild.id)
+        pool_size = min(config.channel_pool_size, MAX_POOL_SIZE) if config else 0
+        category_ids = set(config.ticket_categories) if config else set()
+        if guild.id not in self._discovered:
+            self.discover(guild, category_ids)
+
+        pools = self._channels.setdefault(guild.id, {})
+        for category_id in category_ids | set(pools):
+            category = guild.get_channel(category_id)
+            if not isinstance(category, discord.CategoryChannel):
+                pools.pop(category_id, None)
+                continue
+            channel_ids = pools.setdefault(category_id, [])
+            target = pool_size if category_id in category_ids else 0
+
+            while len(channel_ids) > target:
+                channel = guild.get_channel(channel_ids.pop())
+                if channel is not None:
+                    await rest_scheduler.run(lambda: channel.delete(reason="Ticket channel pool shrunk"), guild_id=guild.id, route="channel_delete", priority=BACKGROUND)
+                    await asyncio.sleep(REFILL_DELAY)
+
+            while len(channel_ids) < target:
+                overwrites = {
+                    guild.default_role: discord.PermissionOverwrite(read_messages=False),
+                    guild.me: discord.PermissionOverwrite(read_messages=True, send_messages=True)
+                }
+                channel = await rest_scheduler.run(lambda: guild.create_text_channel(name=POOL_CHANNEL_NAME, category=category, overwrites=overwrites, reason="Ticket channel pool refill"), guild_id=guild.id, route="channel_create", priority=BACKGROUND)
+                channel_ids.append(channel.id)
+                self.created += 1
+                await asyncio.sleep(REFILL_DELAY)
+
+    def stats(self) -> dict:
+        return {
+            "pooled": sum(len(channel_ids) for pools in self._channels.values() for channel_ids in pools.values()),
+            "claimed": self.claimed,
+            "created": self.created
+        }
+
+channel_pool = ChannelPool()
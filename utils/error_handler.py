@@ -1,32 +1,36 @@
 import discord
 from utils.embeds import create_error_embed
-from db.database import get_db_connection, get_log_channel_id
+from utils.rest_scheduler import rest_scheduler
+from db.database import get_log_channel_id_async
+
+async def send_response(interaction: discord.Interaction, **kwargs):
+    if interaction.response.is_done():
+        await interaction.followup.send(**kwargs)
+    else:
+        await interaction.response.send_message(**kwargs)
 
 async def handle_command_exception(interaction: discord.Interaction, client: discord.Client, error_message: str, exception: Exception):
     log_channel_id = None
     response = ""
     try:
 
-        connection = get_db_connection()
-        db_cursor = connection.cursor()
-
         server_id = interaction.guild.id
-        log_channel_id = get_log_channel_id(server_id) 
+        log_channel_id = await get_log_channel_id_async(server_id) 
         response = log_channel_id
         
         if log_channel_id is None:
             embed = create_error_embed("No configuration found for this server. Use /help config for more information.")
-            await interaction.response.send_message(embed=embed)
+            await send_response(interaction, embed=embed)
             return
 
         embed = create_error_embed(f"An error occurred: {error_message} - {exception}")
         log_channel = client.get_channel(int(log_channel_id))
 
         if log_channel:
-            await log_channel.send(embed=embed)
+            rest_scheduler.schedule(lambda: log_channel.send(embed=embed), guild_id=server_id, route="log_send")
         else:
             embed = create_error_embed("Log channel not found, please set it using /config set log_channel_id <channel_id>.")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await send_response(interaction, embed=embed, ephemeral=True)
             
     except Exception as e:
         print(e)
@@ -34,5 +38,7 @@ async def handle_command_exception(interaction: discord.Interaction, client: dis
         
         embed = create_error_embed("An error occurred while handling the exception. Please try again later.")
         embed_log = create_error_embed(f"Logs: An error occurred while handling the exception. {e}")
-        await client.get_channel(int(log_channel_id)).send(embed=embed_log)
-        await interaction.response.send_message(embed=embed, ephemeral=True)
\ No newline at end of file
+        log_channel = client.get_channel(int(log_channel_id)) if log_channel_id else None
+        if log_channel:
+            rest_scheduler.schedule(lambda: log_channel.send(embed=embed_log), guild_id=interaction.guild_id, route="log_send")
+        await send_response(interaction, embed=embed, ephemeral=True)
\ No newline at end of file
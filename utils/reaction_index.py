@@ -0,0 +1,60 @@
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+import discord
+
+def emoji_key(emoji) -> str:
+    if isinstance(emoji, str):
+        emoji = discord.PartialEmoji.from_str(emoji.strip())
+    return str(emoji.id) if emoji.id else emoji.name
+
+class ReactionIndex:
+    def __init__(self):
+        self._roles: Dict[Tuple[int, str], int] = {}
+        self._messages: Dict[int, Set[str]] = {}
+        self.loaded = False
+        self.matched = 0
+        self.ignored = 0
+
+    def load(self, rows: Iterable[Tuple[int, str, int]]):
+        self._roles = {}
+        self._messages = {}
+        for message_id, react_emoji, role_id in rows:
+            self.add(int(message_id), react_emoji, int(role_id))
+        self.loaded = True
+
+    def add(self, message_id: int, react_emoji: str, role_id: int):
+        self._roles[(message_id, react_emoji)] = role_id
+        self._messages.setdefault(message_id, set()).add(react_emoji)
+
+    def remove(self, message_id: int, react_emoji: str):
+        self._roles.pop((message_id, react_emoji), None)
+        emojis = self._messages.get(message_id)
+        if emojis is not None:
+            emojis.discard(react_emoji)
+            if not emojis:
+                del self._messages[message_id]
+
+    def has_message(self, message_id: int) -> bool:
+        return message_id in self._messages
+
+    def remove_message(self, message_id: int):
+        for react_emoji in self._messages.pop(message_id, ()):
+            self._roles.pop((message_id, react_emoji), None)
+
+    def get(self, message_id: int, emoji: discord.PartialEmoji) -> Optional[int]:
+        role_id = self._roles.get((message_id, emoji_key(emoji))) if message_id in self._messages else None
+        if role_id is None:
+            self.ignored += 1
+        else:
+            self.matched += 1
+        return role_id
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._roles),
+            "messages": len(self._messages),
+            "matched": self.matched,
+            "ignored": self.ignored
+        }
+
+reaction_index = ReactionIndex()
@@ -0,0 +1,125 @@
+import asyncio
+import heapq
+import itertools
+import random
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import discord
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+GLOBAL_CONCURRENCY = 8
+GUILD_CONCURRENCY = 3
+ROUTE_CONCURRENCY = 1
+MAX_ATTEMPTS = 4
+RETRY_BASE_DELAY = 0.5
+IDEMPOTENT_ROUTES = frozenset({"channel_delete", "channel_edit", "channel_permissions", "member_fetch", "member_roles", "progress_edit", "reaction_add"})
+
+class PrioritySemaphore:
+    def __init__(self, value: int):
+        self._value = value
+        self._waiters = []
+        self._counter = itertools.count()
+
+    @property
+    def available(self) -> int:
+        return self._value
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, priority: int):
+        if self._value > 0 and not self._waiters:
+            self._value -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                self._waiters = [waiter for waiter in self._waiters if waiter[2] is not future]
+                heapq.heapify(self._waiters)
+            raise
+
+    def release(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._value += 1
+
+class RestScheduler:
+    def __init__(self, concurrency: int = GLOBAL_CONCURRENCY, guild_concurrency: int = GUILD_CONCURRENCY, route_concurrency: int = ROUTE_CONCURRENCY):
+        self.concurrency = concurrency
+        self._global = PrioritySemaphore(concurrency)
+        self._guilds: Dict[int, PrioritySemaphore] = defaultdict(lambda: PrioritySemaphore(guild_concurrency))
+        self._routes: Dict[Tuple[int, str], PrioritySemaphore] = defaultdict(lambda: PrioritySemaphore(route_concurrency))
+        self._background = set()
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+        self.rate_limited = 0
+
+    async def run(self, call: Callable[[], Awaitable], guild_id: Optional[int] = None, route: str = "default", priority: int = INTERACTIVE):
+        guild_gate = self._guilds[guild_id or 0]
+        route_gate = self._routes[(guild_id or 0, route)]
+        await route_gate.acquire(priority)
+        try:
+            await guild_gate.acquire(priority)
+            try:
+                await self._global.acquire(priority)
+                try:
+                    return await self._call_with_retry(call, route in IDEMPOTENT_ROUTES)
+                finally:
+                    self._global.release()
+            finally:
+                guild_gate.release()
+        finally:
+            route_gate.release()
+
+    def schedule(self, call: Callable[[], Awaitable], guild_id: Optional[int] = None, route: str = "default", priority: int = BACKGROUND) -> asyncio.Task:
+        task = asyncio.create_task(self.run(call, guild_id=guild_id, route=route, priority=priority))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    async def _call_with_retry(self, call: Callable[[], Awaitable], idempotent: bool):
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                result = await call()
+                self.completed += 1
+                return result
+            except discord.HTTPException as e:
+                retryable = e.status == 429 or (idempotent and e.status >= 500)
+                if e.status == 429:
+                    self.rate_limited += 1
+                if not retryable or attempt == MAX_ATTEMPTS:
+                    self.failed += 1
+                    raise
+                self.retries += 1
+                delay = RETRY_BASE_DELAY * (2 ** (attempt - 1))
+                await asyncio.sleep(delay + random.uniform(0, delay))
+            except Exception:
+                self.failed += 1
+                raise
+
+    def stats(self) -> dict:
+        return {
+            "headroom": self._global.available,
+            "concurrency": self.concurrency,
+            "waiting": self._global.waiting + sum(gate.waiting for gate in self._guilds.values()) + sum(gate.waiting for gate in self._routes.values()),
+            "background_jobs": len(self._background),
+            "completed": self.completed,
+            "failed": self.failed,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited
+        }
+
+rest_scheduler = RestScheduler()
@@ -0,0 +1,141 @@
+import asyncio
+import datetime
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+import discord
+
+from utils.rest_scheduler import rest_scheduler, BACKGROUND
+
+ROLE_UPDATE_WINDOW = 1.5
+ROLE_UPDATE_WORKERS = 4
+APPLIED_TTL = 10.0
+
+class RoleUpdateCoalescer:
+    def __init__(self, window: float = ROLE_UPDATE_WINDOW, workers: int = ROLE_UPDATE_WORKERS):
+        self.window = window
+        self.worker_count = workers
+        self.client: Optional[discord.Client] = None
+        self._pending: Dict[Tuple[int, int], Dict[int, bool]] = {}
+        self._timers: Dict[Tuple[int, int], asyncio.TimerHandle] = {}
+        self._flushing: Set[Tuple[int, int]] = set()
+        self._requeue: Set[Tuple[int, int]] = set()
+        self._applied: "OrderedDict[Tuple[int, int], Tuple[float, Dict[int, bool]]]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers = []
+        self.requested = 0
+        self.calls = 0
+        self.cancelled = 0
+        self.failed = 0
+
+    def start(self, client: discord.Client):
+        self.client = client
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._work()) for _ in range(self.worker_count)]
+
+    def stop(self):
+        for handle in self._timers.values():
+            handle.cancel()
+        self._timers.clear()
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+
+    def request(self, guild_id: int, member_id: int, role_id: int, add: bool):
+        if self._queue is None:
+            return
+        key = (guild_id, member_id)
+        self.requested += 1
+        self._pending.setdefault(key, {})[role_id] = add
+        if key not in self._timers:
+            self._timers[key] = asyncio.get_running_loop().call_later(self.window, self._due, key)
+
+    def _due(self, key: Tuple[int, int]):
+        self._timers.pop(key, None)
+        if key in self._flushing:
+            self._requeue.add(key)
+        else:
+            self._queue.put_nowait(key)
+
+    async def _work(self):
+        while True:
+            key = await self._queue.get()
+            self._flushing.add(key)
+            try:
+                await self._flush(key)
+            except Exception as e:
+                self.failed += 1
+                print(f"[{datetime.datetime.now()}] [\033[91mERROR\033[0;0m]: role update for member {key[1]} failed: {e}")
+            finally:
+                self._flushing.discard(key)
+                if key in self._requeue:
+                    self._requeue.discard(key)
+                    self._queue.put_nowait(key)
+                self._queue.task_done()
+
+    async def _flush(self, key: Tuple[int, int]):
+        changes = self._pending.pop(key, None)
+        guild = self.client.get_guild(key[0]) if changes else None
+        if guild is None:
+            return
+        member = guild.get_member(key[1])
+        if member is None:
+            member = await rest_scheduler.run(lambda: guild.fetch_member(key[1]), guild_id=guild.id, route="member_fetch", priority=BACKGROUND)
+        if member.bot:
+            return
+
+        async def apply():
+            current = {role.id for role in (guild.get_member(member.id) or member).roles if not role.is_default()}
+            for role_id, add in self._recently_applied(key).items():
+                if add:
+                    current.add(role_id)
+                else:
+                    current.discard(role_id)
+            added = {role_id for role_id, add in changes.items() if add and role_id not in current}
+            removed = {role_id for role_id, add in changes.items() if not add and role_id in current}
+            if not added and not removed:
+                self.cancelled += 1
+                return
+            self.calls += 1
+            if len(added) + len(removed) == 1:
+                role = guild.get_role(next(iter(added or removed)))
+                if role is None:
+                    return
+                if added:
+                    await member.add_roles(role, reason="Reaction roles")
+                else:
+                    await member.remove_roles(role, reason="Reaction roles")
+            else:
+                roles = [role for role in map(guild.get_role, (current | added) - removed) if role is not None]
+                await member.edit(roles=roles, reason="Reaction roles")
+            self._remember_applied(key, {**{role_id: True for role_id in added}, **{role_id: False for role_id in removed}})
+
+        await rest_scheduler.run(apply, guild_id=guild.id, route="member_roles", priority=BACKGROUND)
+
+    def _recently_applied(self, key: Tuple[int, int]) -> Dict[int, bool]:
+        entry = self._applied.get(key)
+        return entry[1] if entry and time.monotonic() - entry[0] < APPLIED_TTL else {}
+
+    def _remember_applied(self, key: Tuple[int, int], applied: Dict[int, bool]):
+        now = time.monotonic()
+        merged = {**self._recently_applied(key), **applied}
+        self._applied.pop(key, None)
+        self._applied[key] = (now, merged)
+        while self._applied and now - next(iter(self._applied.values()))[0] >= APPLIED_TTL:
+            self._applied.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "requested": self.requested,
+            "calls": self.calls,
+            "calls_saved": self.requested - self.calls,
+            "cancelled": self.cancelled,
+            "failed": self.failed,
+            "pending_members": len(self._pending),
+            "queued": self._queue.qsize() if self._queue else 0
+        }
+
+role_updates = RoleUpdateCoalescer()
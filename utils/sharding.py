@@ -0,0 +1,39 @@
+from typing import Iterable, List, Optional
+
+import discord
+
+def shard_for(guild_id: int, shard_count: int) -> int:
+    return (guild_id >> 22) % shard_count
+
+def owns_guild(client: discord.Client, guild_id: int) -> bool:
+    shard_count = getattr(client, "shard_count", None)
+    shard_ids = getattr(client, "shard_ids", None)
+    if not shard_count or shard_ids is None:
+        return True
+    return shard_for(guild_id, shard_count) in shard_ids
+
+def parse_shard_ids(value: Optional[str]) -> Optional[List[int]]:
+    if not value:
+        return None
+    shard_ids = []
+    for part in value.split(","):
+        if "-" in part:
+            first, last = part.split("-", 1)
+            shard_ids.extend(range(int(first), int(last) + 1))
+        else:
+            shard_ids.append(int(part))
+    return shard_ids
+
+def cluster_ranges(shard_count: int, clusters: int) -> List[List[int]]:
+    clusters = max(min(clusters, shard_count), 1)
+    size, extra = divmod(shard_count, clusters)
+    ranges, start = [], 0
+    for cluster in range(clusters):
+        end = start + size + (1 if cluster < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+def format_shard_ids(shard_ids: Iterable[int]) -> str:
+    shard_ids = sorted(shard_ids)
+    return f"{shard_ids[0]}-{shard_ids[-1]}" if shard_ids else ""
@@ -0,0 +1,116 @@
+import heapq
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import discord
+
+from db.database import fetch_assigned_tickets_async, fetch_category_admins_async, fetch_guild_config_async
+
+PRIORITY_WEIGHTS = {"low": 1, "medium": 2, "high": 3}
+
+class TicketRouter:
+    def __init__(self):
+        self._loads: Dict[int, Dict[int, int]] = {}
+        self._heaps: Dict[int, List[Tuple[int, int]]] = {}
+        self._tickets: Dict[int, Tuple[int, int, int]] = {}
+        self._pools: Dict[int, Dict[int, Set[int]]] = {}
+        self._loaded = False
+        self.routed = 0
+
+    async def start(self, owns: Optional[Callable[[int], bool]] = None):
+        if self._loaded:
+            return
+        for server_id, ticket_id, admin_id, priority in await fetch_assigned_tickets_async():
+            if owns is None or owns(server_id):
+                self.assign(server_id, ticket_id, admin_id, priority)
+        self._loaded = True
+
+    def load(self, server_id: int, admin_id: int) -> int:
+        return self._loads.get(server_id, {}).get(admin_id, 0)
+
+    def assigned_to(self, ticket_id: int) -> Optional[int]:
+        ticket = self._tickets.get(ticket_id)
+        return ticket[1] if ticket else None
+
+    def _set_load(self, server_id: int, admin_id: int, load: int):
+        loads = self._loads.setdefault(server_id, {})
+        heap = self._heaps.setdefault(server_id, [])
+        loads[admin_id] = load
+        heapq.heappush(heap, (load, admin_id))
+        if len(heap) > 2 * len(loads) + 64:
+            self._heaps[server_id] = [(admin_load, admin) for admin, admin_load in loads.items()]
+            heapq.heapify(self._heaps[server_id])
+
+    def assign(self, server_id: int, ticket_id: int, admin_id: int, priority: str = "medium"):
+        self.release(ticket_id)
+        weight = PRIORITY_WEIGHTS.get(priority, PRIORITY_WEIGHTS["medium"])
+        self._tickets[ticket_id] = (server_id, admin_id, weight)
+        self._set_load(server_id, admin_id, self.load(server_id, admin_id) + weight)
+
+    def release(self, ticket_id: int):
+        ticket = self._tickets.pop(ticket_id, None)
+        if ticket is None:
+            return
+        server_id, admin_id, weight = ticket
+        self._set_load(server_id, admin_id, max(self.load(server_id, admin_id) - weight, 0))
+
+    def reweight(self, ticket_id: int, priority: str):
+        ticket = self._tickets.get(ticket_id)
+        if ticket is not None:
+            self.assign(ticket[0], ticket_id, ticket[1], priority)
+
+    def pick(self, server_id: int, candidates: Iterable[int], exclude: Optional[int] = None) -> Optional[int]:
+        candidates = set(candidates)
+        candidates.discard(exclude)
+        if not candidates:
+            return None
+        loads = self._loads.setdefault(server_id, {})
+        for admin_id in candidates:
+            if admin_id not in loads:
+                self._set_load(server_id, admin_id, 0)
+
+        heap = self._heaps[server_id]
+        popped = []
+        chosen = None
+        while heap:
+            load, admin_id = heapq.heappop(heap)
+            if loads.get(admin_id) != load:
+                continue
+            popped.append((load, admin_id))
+            if admin_id in candidates:
+                chosen = admin_id
+                break
+        for entry in popped:
+            heapq.heappush(heap, entry)
+        return chosen
+
+    async def pool_for(self, server_id: int, category_id: int) -> Set[int]:
+        pools = self._pools.get(server_id)
+        if pools is None:
+            pools = {category: set(admin_ids) for category, admin_ids in (await fetch_category_admins_async(server_id)).items()}
+            self._pools[server_id] = pools
+        return pools.get(category_id, set())
+
+    def invalidate_pools(self, server_id: int):
+        self._pools.pop(server_id, None)
+
+    async def route(self, guild: discord.Guild, category_id: int, exclude: Optional[int] = None) -> Optional[int]:
+        candidate_ids = await self.pool_for(guild.id, category_id)
+        if not candidate_ids:
+            config = await fetch_guild_config_async(guild.id)
+            candidate_ids = set(config.admin_role_ids) if config else set()
+
+        members = [member for member in map(guild.get_member, candidate_ids) if member is not None and not member.bot]
+        available = [member for member in members if member.status != discord.Status.offline]
+        admin_id = self.pick(guild.id, [member.id for member in available or members], exclude=exclude)
+        if admin_id is not None:
+            self.routed += 1
+        return admin_id
+
+    def stats(self) -> dict:
+        return {
+            "assigned_tickets": len(self._tickets),
+            "admins": sum(len(loads) for loads in self._loads.values()),
+            "routed": self.routed
+        }
+
+ticket_router = TicketRouter()
@@ -0,0 +1,161 @@
+import asyncio
+import datetime
+import heapq
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from db.database import fetch_ticket_timers_async
+from db.write_behind import write_behind
+
+REMINDER_AFTER = 24 * 3600
+ESCALATE_AFTER = 48 * 3600
+AUTO_CLOSE_AFTER = 72 * 3600
+TOUCH_DEBOUNCE = 60
+TIMER_CONCURRENCY = 4
+
+IDLE_ACTIONS = (
+    ("reminder", REMINDER_AFTER),
+    ("escalate", ESCALATE_AFTER),
+    ("auto_close", AUTO_CLOSE_AFTER),
+)
+
+class TicketTimers:
+    def __init__(self):
+        self._heap = []
+        self._deadlines: Dict[Tuple[int, str], float] = {}
+        self._channels: Dict[int, Tuple[int, int]] = {}
+        self._tickets: Dict[int, Tuple[int, int]] = {}
+        self._last_touch: Dict[int, float] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._running = set()
+        self._handler: Optional[Callable[[int, int, int, str], Awaitable]] = None
+        self.fired = 0
+
+    async def start(self, handler: Callable[[int, int, int, str], Awaitable], owns: Optional[Callable[[int], bool]] = None):
+        self._handler = handler
+        if self._task is not None and not self._task.done():
+            return
+        timers, open_tickets = await fetch_ticket_timers_async()
+        if owns is not None:
+            timers = [timer for timer in timers if owns(timer[2])]
+            open_tickets = [ticket for ticket in open_tickets if owns(ticket[0])]
+        for ticket_id, action, server_id, channel_id, due_at in timers:
+            self._remember(server_id, ticket_id, channel_id)
+            self._push(ticket_id, action, due_at)
+        now = time.time()
+        scheduled = {ticket_id for ticket_id, _ in self._deadlines}
+        for server_id, ticket_id, channel_id in open_tickets:
+            self._remember(server_id, ticket_id, channel_id)
+            if ticket_id not in scheduled:
+                await self._schedule_idle(server_id, ticket_id, channel_id, now)
+        self._slots = asyncio.Semaphore(TIMER_CONCURRENCY)
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in self._running:
+            task.cancel()
+        self._running.clear()
+
+    def is_ticket_channel(self, channel_id: int) -> bool:
+        return channel_id in self._channels
+
+    def ticket_for_channel(self, channel_id: int) -> Optional[Tuple[int, int]]:
+        return self._channels.get(channel_id)
+
+    def _remember(self, server_id: int, ticket_id: int, channel_id: int):
+        self._channels[channel_id] = (server_id, ticket_id)
+        self._tickets[ticket_id] = (server_id, channel_id)
+
+    async def track(self, server_id: int, ticket_id: int, channel_id: int):
+        self._remember(server_id, ticket_id, channel_id)
+        await self._schedule_idle(server_id, ticket_id, channel_id, time.time())
+
+    async def touch(self, channel_id: int):
+        ticket = self._channels.get(channel_id)
+        if ticket is None:
+            return
+        now = time.time()
+        if now - self._last_touch.get(channel_id, 0) < TOUCH_DEBOUNCE:
+            return
+        self._last_touch[channel_id] = now
+        server_id, ticket_id = ticket
+        await self._schedule_idle(server_id, ticket_id, channel_id, now)
+        await write_behind.submit('''UPDATE tickets SET updated_at = CURRENT_TIMESTAMP WHERE ticket_id = ?''', (ticket_id,))
+
+    async def forget(self, ticket_id: int):
+        ticket = self._tickets.pop(ticket_id, None)
+        if ticket is not None:
+            self._channels.pop(ticket[1], None)
+            self._last_touch.pop(ticket[1], None)
+        for action, _ in IDLE_ACTIONS:
+            self._deadlines.pop((ticket_id, action), None)
+        await write_behind.submit('''DELETE FROM ticket_timers WHERE ticket_id = ?''', (ticket_id,))
+
+    async def _schedule_idle(self, server_id: int, ticket_id: int, channel_id: int, now: float):
+        for action, delay in IDLE_ACTIONS:
+            due_at = now + delay
+            self._push(ticket_id, action, due_at)
+            await write_behind.submit(
+                '''INSERT INTO ticket_timers (ticket_id, action, server_id, channel_id, due_at) VALUES (?, ?, ?, ?, ?) ON CONFLICT (ticket_id, action) DO UPDATE SET due_at = excluded.due_at, channel_id = excluded.channel_id''',
+                (ticket_id, action, server_id, channel_id, due_at)
+            )
+
+    def _push(self, ticket_id: int, action: str, due_at: float):
+        self._deadlines[(ticket_id, action)] = due_at
+        earliest = not self._heap or due_at < self._heap[0][0]
+        heapq.heappush(self._heap, (due_at, ticket_id, action))
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._heap = [(due, ticket, name) for (ticket, name), due in self._deadlines.items()]
+            heapq.heapify(self._heap)
+        if earliest:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            while self._heap and self._deadlines.get((self._heap[0][1], self._heap[0][2])) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+
+            self._wakeup.clear()
+            timeout = max(self._heap[0][0] - time.time(), 0) if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+                continue
+            except asyncio.TimeoutError:
+                pass
+
+            due_at, ticket_id, action = heapq.heappop(self._heap)
+            if self._deadlines.get((ticket_id, action)) != due_at:
+                continue
+            del self._deadlines[(ticket_id, action)]
+            await write_behind.submit('''DELETE FROM ticket_timers WHERE ticket_id = ? AND action = ?''', (ticket_id, action))
+            ticket = self._tickets.get(ticket_id)
+            if ticket is None:
+                continue
+            server_id, channel_id = ticket
+            self.fired += 1
+            task = asyncio.create_task(self._fire(server_id, ticket_id, channel_id, action))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _fire(self, server_id: int, ticket_id: int, channel_id: int, action: str):
+        async with self._slots:
+            try:
+                await self._handler(server_id, ticket_id, channel_id, action)
+            except Exception as e:
+                print(f"[{datetime.datetime.now()}] [\033[91mERROR\033[0;0m]: ticket timer {action} for #{ticket_id} failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._deadlines),
+            "heap_size": len(self._heap),
+            "tracked_tickets": len(self._tickets),
+            "fired": self.fired,
+            "running": len(self._running)
+        }
+
+ticket_timers = TicketTimers()
@@ -0,0 +1,42 @@
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+class StageTimer:
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.stages: Dict[str, float] = {}
+        self._started = time.perf_counter()
+        self._last = self._started
+
+    def mark(self, stage: str):
+        now = time.perf_counter()
+        self.stages[stage] = now - self._last
+        self._last = now
+
+    def finish(self):
+        self.stages["total"] = time.perf_counter() - self._started
+        latency_stats.record(self.operation, self.stages)
+
+class LatencyStats:
+    def __init__(self):
+        self._stats = defaultdict(lambda: {"count": 0, "total": 0.0, "max": 0.0})
+
+    def record(self, operation: str, stages: Dict[str, float]):
+        for stage, elapsed in stages.items():
+            entry = self._stats[(operation, stage)]
+            entry["count"] += 1
+            entry["total"] += elapsed
+            entry["max"] = max(entry["max"], elapsed)
+
+    def operations(self) -> List[str]:
+        return sorted({name for name, _ in self._stats})
+
+    def stats(self, operation: str) -> Dict[str, dict]:
+        return {
+            stage: {"count": entry["count"], "avg_ms": entry["total"] / entry["count"] * 1000, "max_ms": entry["max"] * 1000}
+            for (name, stage), entry in self._stats.items()
+            if name == operation
+        }
+
+latency_stats = LatencyStats()
@@ -0,0 +1,53 @@
+import asyncio
+import gzip
+import json
+import os
+from typing import Optional, Tuple
+
+import discord
+
+TRANSCRIPTS_DIR = "transcripts"
+TRANSCRIPT_CHUNK = 100
+MAX_ATTACHMENT_BYTES = 8 * 1024 * 1024
+
+def _message_record(message: discord.Message) -> dict:
+    return {
+        "id": message.id,
+        "author_id": message.author.id,
+        "author": str(message.author),
+        "created_at": message.created_at.isoformat(),
+        "edited_at": message.edited_at.isoformat() if message.edited_at else None,
+        "content": message.content,
+        "attachments": [attachment.url for attachment in message.attachments],
+        "embeds": len(message.embeds)
+    }
+
+async def export_transcript(channel: discord.TextChannel, server_id: int, ticket_id: int) -> Tuple[str, int]:
+    loop = asyncio.get_running_loop()
+    directory = os.path.join(TRANSCRIPTS_DIR, str(server_id))
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"ticket-{ticket_id}.jsonl.gz")
+    partial_path = path + ".part"
+
+    count = 0
+    lines = []
+    transcript = await loop.run_in_executor(None, lambda: gzip.open(partial_path, "wt", encoding="utf-8"))
+    try:
+        async for message in channel.history(limit=None, oldest_first=True):
+            lines.append(json.dumps(_message_record(message), ensure_ascii=False) + "\n")
+            count += 1
+            if len(lines) >= TRANSCRIPT_CHUNK:
+                chunk, lines = "".join(lines), []
+                await loop.run_in_executor(None, transcript.write, chunk)
+        if lines:
+            await loop.run_in_executor(None, transcript.write, "".join(lines))
+    finally:
+        await loop.run_in_executor(None, transcript.close)
+
+    await loop.run_in_executor(None, os.replace, partial_path, path)
+    return path, count
+
+def transcript_file(path: str) -> Optional[discord.File]:
+    if os.path.getsize(path) > MAX_ATTACHMENT_BYTES:
+        return None
+    return discord.File(path, filename=os.path.basename(path))
@@ -0,0 +1,138 @@
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+MAX_TRIGGERS_PER_GUILD = 500
+MAX_TRIGGER_LENGTH = 100
+MAX_REACTIONS_PER_MESSAGE = 5
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+class TriggerAutomaton:
+    def __init__(self, keywords: Iterable[Tuple[int, str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, int]]] = [[]]
+        self._keywords: Dict[int, str] = {}
+
+        for trigger_id, keyword in keywords:
+            keyword = keyword.casefold()
+            if not keyword:
+                continue
+            self._keywords[trigger_id] = keyword
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = next_state
+            self._out[state].append((trigger_id, len(keyword)))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def __len__(self) -> int:
+        return len(self._keywords)
+
+    def match(self, text: str) -> Set[int]:
+        text = text.casefold()
+        goto, fail, out = self._goto, self._fail, self._out
+        matches = set()
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for trigger_id, length in out[state]:
+                if trigger_id in matches:
+                    continue
+                start = end - length
+                keyword = self._keywords[trigger_id]
+                if _is_word(keyword[0]) and start > 0 and _is_word(text[start - 1]):
+                    continue
+                if _is_word(keyword[-1]) and end < len(text) and _is_word(text[end]):
+                    continue
+                matches.add(trigger_id)
+        return matches
+
+class GuildTriggers:
+    def __init__(self):
+        self.triggers: Dict[int, Tuple[str, str, Optional[int]]] = {}
+        self._automaton: Optional[TriggerAutomaton] = None
+
+    def add(self, trigger_id: int, keyword: str, emoji: str, channel_id: Optional[int]):
+        self.triggers[trigger_id] = (keyword, emoji, channel_id)
+        self._automaton = None
+
+    def remove(self, trigger_id: int):
+        if self.triggers.pop(trigger_id, None) is not None:
+            self._automaton = None
+
+    def match(self, text: str, channel_id: int) -> List[str]:
+        if self._automaton is None:
+            self._automaton = TriggerAutomaton((trigger_id, keyword) for trigger_id, (keyword, _, _) in self.triggers.items())
+        emojis = []
+        for trigger_id in sorted(self._automaton.match(text)):
+            _, emoji, trigger_channel_id = self.triggers[trigger_id]
+            if (trigger_channel_id is None or trigger_channel_id == channel_id) and emoji not in emojis:
+                emojis.append(emoji)
+        return emojis[:MAX_REACTIONS_PER_MESSAGE]
+
+class TriggerIndex:
+    def __init__(self):
+        self._guilds: Dict[int, GuildTriggers] = {}
+        self.loaded = False
+        self.messages = 0
+        self.matched = 0
+
+    def load(self, rows: Iterable[Tuple[int, int, Optional[int], str, str]]):
+        self._guilds = {}
+        for trigger_id, server_id, channel_id, keyword, emoji in rows:
+            self.add(server_id, trigger_id, keyword, emoji, channel_id)
+        self.loaded = True
+
+    def add(self, server_id: int, trigger_id: int, keyword: str, emoji: str, channel_id: Optional[int] = None):
+        self._guilds.setdefault(server_id, GuildTriggers()).add(trigger_id, keyword, emoji, channel_id)
+
+    def remove(self, server_id: int, trigger_id: int):
+        triggers = self._guilds.get(server_id)
+        if triggers is not None:
+            triggers.remove(trigger_id)
+            if not triggers.triggers:
+                del self._guilds[server_id]
+
+    def count(self, server_id: int) -> int:
+        triggers = self._guilds.get(server_id)
+        return len(triggers.triggers) if triggers else 0
+
+    def match(self, server_id: int, channel_id: int, text: str) -> List[str]:
+        triggers = self._guilds.get(server_id)
+        if triggers is None or not text:
+            return []
+        self.messages += 1
+        emojis = triggers.match(text, channel_id)
+        if emojis:
+            self.matched += 1
+        return emojis
+
+    def stats(self) -> dict:
+        return {
+            "guilds": len(self._guilds),
+            "triggers": sum(len(triggers.triggers) for triggers in self._guilds.values()),
+            "messages": self.messages,
+            "matched": self.matched
+        }
+
+trigger_index = TriggerIndex()